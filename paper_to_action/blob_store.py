@@ -0,0 +1,278 @@
+"""
+内容寻址存储模块 - 按 SHA-256 去重保存 PDF，对外以硬链接/reflink 视图呈现
+
+同一份 PDF 只在 objects/ 下保存一次；按标题命名的文件和收藏夹中的文件都是指向
+该对象的视图。每个对象旁的 .refs 文件记录其视图路径，最后一个视图释放时删除对象。
+"""
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+# Linux FICLONE ioctl：在支持的文件系统（Btrfs、XFS 等）上创建共享数据块的副本
+FICLONE = 0x40049409
+
+
+def _reflink(src: str, dst: str):
+    """创建 reflink 副本，不支持时抛出 OSError"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflink not supported on this platform")
+
+    with open(src, 'rb') as s, open(dst, 'wb') as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        except OSError:
+            d.close()
+            os.remove(dst)
+            raise
+
+
+class BlobStore:
+    """按 SHA-256 寻址的文件存储"""
+
+    def __init__(self, root: str):
+        """
+        初始化存储
+
+        Args:
+            root: 存储根目录，应与视图文件位于同一文件系统以便硬链接
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self._lock = threading.RLock()
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def digest_file(path: str) -> str:
+        """
+        计算文件的 SHA-256
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            十六进制摘要
+        """
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def blob_path(self, digest: str) -> Path:
+        """对象文件路径（按摘要前两位分目录）"""
+        return self.objects_dir / digest[:2] / digest
+
+    def _refs_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.refs"
+
+    def _load_refs(self, digest: str) -> List[str]:
+        refs_path = self._refs_path(digest)
+        if not refs_path.exists():
+            return []
+        try:
+            with open(refs_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            return []
+
+    def _save_refs(self, digest: str, refs: List[str]):
+        refs_path = self._refs_path(digest)
+        tmp_path = refs_path.with_suffix('.refs.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(set(refs)), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, refs_path)
+
+    def refcount(self, digest: str) -> int:
+        """对象当前的视图数量"""
+        return len(self._load_refs(digest))
+
+    def _materialize(self, blob: Path, view_path: str) -> str:
+        """
+        在 view_path 创建对象的视图：优先硬链接，其次 reflink，最后复制
+
+        先写入临时文件再原子替换，已存在的同名文件会被覆盖。
+
+        Returns:
+            使用的方式（hardlink / reflink / copy）
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(view_path)), exist_ok=True)
+        tmp_path = f"{view_path}.link-tmp"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+        try:
+            os.link(blob, tmp_path)
+            method = "hardlink"
+        except OSError:
+            try:
+                _reflink(str(blob), tmp_path)
+                method = "reflink"
+            except OSError:
+                shutil.copy2(blob, tmp_path)
+                method = "copy"
+
+        os.replace(tmp_path, view_path)
+        return method
+
+    def put(self, src_path: str, view_path: Optional[str] = None) -> str:
+        """
+        把文件存入仓库，并在 view_path 留下视图
+
+        内容已存在时直接丢弃 src_path，不再保存第二份。
+
+        Args:
+            src_path: 源文件（会被移动或删除）
+            view_path: 视图路径，默认与 src_path 相同（原地入库）
+
+        Returns:
+            文件的 SHA-256
+        """
+        view_path = view_path or src_path
+        digest = self.digest_file(src_path)
+        blob = self.blob_path(digest)
+
+        with self._lock:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            if blob.exists():
+                os.remove(src_path)
+            else:
+                try:
+                    os.replace(src_path, blob)
+                except OSError:
+                    # 跨文件系统时退回复制
+                    shutil.move(src_path, str(blob))
+                # 视图共享同一数据，设为只读防止通过某个视图修改全部副本
+                os.chmod(blob, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+            self._materialize(blob, view_path)
+            refs = self._load_refs(digest)
+            refs.append(os.path.abspath(view_path))
+            self._save_refs(digest, refs)
+
+        return digest
+
+    def link(self, digest: str, view_path: str) -> str:
+        """
+        为已有对象创建新视图
+
+        Args:
+            digest: 对象的 SHA-256
+            view_path: 视图路径
+
+        Returns:
+            视图路径
+        """
+        blob = self.blob_path(digest)
+        with self._lock:
+            if not blob.exists():
+                raise FileNotFoundError(f"blob not found: {digest}")
+            self._materialize(blob, view_path)
+            refs = self._load_refs(digest)
+            refs.append(os.path.abspath(view_path))
+            self._save_refs(digest, refs)
+        return view_path
+
+    def add_view(self, existing_path: str, view_path: str) -> str:
+        """
+        为某个现有文件再创建一个视图；文件尚未入库时先原地入库
+
+        Args:
+            existing_path: 现有文件（视图或普通文件）
+            view_path: 新视图路径
+
+        Returns:
+            文件的 SHA-256
+        """
+        digest = self.digest_file(existing_path)
+        if os.path.abspath(existing_path) not in self._load_refs(digest):
+            self.put(existing_path)
+        self.link(digest, view_path)
+        return digest
+
+    def release(self, view_path: str) -> bool:
+        """
+        删除一个视图，对象没有其他视图时一并删除
+
+        Args:
+            view_path: 视图路径
+
+        Returns:
+            是否删除了视图
+        """
+        if not os.path.exists(view_path):
+            return False
+
+        digest = self.digest_file(view_path)
+        with self._lock:
+            os.remove(view_path)
+
+            # 顺带清理已在外部被删除的视图
+            target = os.path.abspath(view_path)
+            refs = [ref for ref in self._load_refs(digest) if ref != target and os.path.exists(ref)]
+            if refs:
+                self._save_refs(digest, refs)
+            else:
+                blob = self.blob_path(digest)
+                if blob.exists():
+                    os.chmod(blob, stat.S_IRUSR | stat.S_IWUSR)
+                    os.remove(blob)
+                refs_path = self._refs_path(digest)
+                if refs_path.exists():
+                    os.remove(refs_path)
+        return True
+
+
+_blob_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def _store_from_config(config) -> BlobStore:
+    """在输出目录下创建 .blobs 存储，使 pdfs/ 与 favorites/ 的视图可以硬链接到同一对象"""
+    return BlobStore(str(Path(config.get("output_dir", "papers")) / ".blobs"))
+
+
+def configure_blob_store(config=None) -> BlobStore:
+    """
+    根据配置重建全局 PDF 存储
+
+    Args:
+        config: Config 实例，None 表示加载默认配置
+
+    Returns:
+        新的全局存储
+    """
+    global _blob_store
+
+    if config is None:
+        from .config import Config
+        config = Config()
+
+    store = _store_from_config(config)
+    with _store_lock:
+        _blob_store = store
+    return store
+
+
+def get_blob_store() -> BlobStore:
+    """
+    获取全局 PDF 存储（首次调用时按默认配置创建）
+
+    Returns:
+        BlobStore
+    """
+    global _blob_store
+
+    if _blob_store is None:
+        from .config import Config
+        config = Config()
+        with _store_lock:
+            if _blob_store is None:
+                _blob_store = _store_from_config(config)
+    return _blob_store
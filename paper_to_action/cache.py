@@ -0,0 +1,352 @@
+"""
+响应缓存模块 - 基于 SQLite 的持久化缓存，支持 TTL 与按容量的 LRU 淘汰
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from rich.console import Console
+
+console = Console()
+
+
+class ResponseCache:
+    """持久化响应缓存"""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: Optional[float] = 21600,
+        max_size: int = 200 * 1024 * 1024,
+        enabled: bool = True
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite 缓存文件路径
+            ttl: 条目有效期（秒），None 表示永不过期
+            max_size: 缓存总大小上限（字节），超出时按最近最少使用淘汰
+            enabled: 是否启用缓存，False 时所有读写直接跳过
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 数据源线程池会并发读取缓存，计数器单独加锁，不与淘汰争用
+        self._stats_lock = threading.Lock()
+
+        if self.enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._init_db()
+
+    def _get_connection(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _init_db(self):
+        """初始化缓存表"""
+        conn = self._get_connection()
+        try:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL
+            )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)')
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(namespace: str, *parts: Any) -> str:
+        """
+        根据命名空间和查询参数生成缓存键
+
+        字典按键排序、字符串压缩多余空白，保证等价查询得到相同的键。
+
+        Args:
+            namespace: 命名空间（如数据源名称）
+            *parts: URL、查询参数等
+
+        Returns:
+            SHA-256 十六进制键
+        """
+        def normalize(value):
+            if isinstance(value, dict):
+                return {str(k): normalize(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))
+                        if v is not None}
+            if isinstance(value, (list, tuple)):
+                return [normalize(v) for v in value]
+            if isinstance(value, str):
+                return ' '.join(value.split())
+            return value
+
+        payload = json.dumps([namespace, normalize(list(parts))], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        读取缓存条目
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存内容，未命中或已过期返回 None
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        conn = self._get_connection()
+        try:
+            row = conn.execute('SELECT value, expires_at FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._count(hit=False)
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                conn.commit()
+                self._count(hit=False)
+                return None
+
+            conn.execute('UPDATE entries SET accessed_at = ? WHERE key = ?', (now, key))
+            conn.commit()
+            self._count(hit=True)
+            return bytes(value)
+        except sqlite3.Error as e:
+            console.print(f"[yellow]⚠ 读取缓存失败: {e}[/yellow]")
+            return None
+        finally:
+            conn.close()
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """
+        写入缓存条目
+
+        Args:
+            key: 缓存键
+            value: 缓存内容
+            ttl: 本条目的有效期（秒），None 表示使用默认 TTL
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+
+        conn = self._get_connection()
+        try:
+            conn.execute('''
+            INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', (key, sqlite3.Binary(value), len(value), now, now, expires_at))
+            conn.commit()
+            self._evict(conn)
+        except sqlite3.Error as e:
+            console.print(f"[yellow]⚠ 写入缓存失败: {e}[/yellow]")
+        finally:
+            conn.close()
+
+    def get_json(self, key: str) -> Optional[Any]:
+        """读取 JSON 缓存条目"""
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return json.loads(value.decode('utf-8'))
+        except ValueError:
+            return None
+
+    def set_json(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入 JSON 缓存条目"""
+        self.set(key, json.dumps(value, ensure_ascii=False).encode('utf-8'), ttl)
+
+    def _evict(self, conn):
+        """删除过期条目，并在超出容量时按最近最少使用淘汰"""
+        with self._lock:
+            conn.execute('DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?', (time.time(),))
+
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total > self.max_size:
+                excess = total - self.max_size
+                victims = []
+                for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed_at'):
+                    victims.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+
+            conn.commit()
+
+    def stats(self) -> dict:
+        """
+        获取缓存统计
+
+        Returns:
+            包含 hits、misses、entries、size 的字典
+        """
+        with self._stats_lock:
+            stats = {'hits': self.hits, 'misses': self.misses, 'entries': 0, 'size': 0}
+        if not self.enabled:
+            return stats
+
+        conn = self._get_connection()
+        try:
+            stats['entries'], stats['size'] = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries'
+            ).fetchone()
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+        return stats
+
+    def clear(self):
+        """清空缓存"""
+        if not self.enabled:
+            return
+
+        conn = self._get_connection()
+        try:
+            conn.execute('DELETE FROM entries')
+            conn.commit()
+        finally:
+            conn.close()
+
+
+_response_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def _cache_from_config(config) -> ResponseCache:
+    """按 Config 中的 cache_* 配置项创建响应缓存"""
+    cache_dir = Path(config.config_path).parent / "cache"
+    max_mb = float(config.get("cache_max_mb", 200))
+    ttl = config.get("cache_ttl", 21600)
+
+    return ResponseCache(
+        path=str(cache_dir / "responses.db"),
+        ttl=float(ttl) if ttl is not None else None,
+        max_size=int(max_mb * 1024 * 1024),
+        enabled=bool(config.get("cache_enabled", True))
+    )
+
+
+def configure_cache(config=None) -> ResponseCache:
+    """
+    根据配置重建全局响应缓存
+
+    Args:
+        config: Config 实例，None 表示加载默认配置
+
+    Returns:
+        新的全局缓存
+    """
+    global _response_cache
+
+    if config is None:
+        from .config import Config
+        config = Config()
+
+    cache = _cache_from_config(config)
+    with _cache_lock:
+        _response_cache = cache
+    return cache
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    获取全局响应缓存（首次调用时按默认配置创建）
+
+    Returns:
+        ResponseCache
+    """
+    global _response_cache
+
+    if _response_cache is None:
+        from .config import Config
+        config = Config()
+        with _cache_lock:
+            if _response_cache is None:
+                _response_cache = _cache_from_config(config)
+    return _response_cache
+
+
+_llm_cache: Optional[ResponseCache] = None
+
+
+def _llm_cache_from_config(config) -> ResponseCache:
+    """按 Config 中的 llm_cache_* 配置项创建 LLM 结果缓存（内容寻址，不设过期时间）"""
+    cache_dir = Path(config.config_path).parent / "cache"
+    max_mb = float(config.get("llm_cache_max_mb", 100))
+
+    return ResponseCache(
+        path=str(cache_dir / "llm_cache.db"),
+        ttl=None,
+        max_size=int(max_mb * 1024 * 1024),
+        enabled=bool(config.get("llm_cache_enabled", True))
+    )
+
+
+def configure_llm_cache(config=None) -> ResponseCache:
+    """
+    根据配置重建全局 LLM 结果缓存
+
+    Args:
+        config: Config 实例，None 表示加载默认配置
+
+    Returns:
+        新的全局 LLM 缓存
+    """
+    global _llm_cache
+
+    if config is None:
+        from .config import Config
+        config = Config()
+
+    cache = _llm_cache_from_config(config)
+    with _cache_lock:
+        _llm_cache = cache
+    return cache
+
+
+def get_llm_cache() -> ResponseCache:
+    """
+    获取全局 LLM 结果缓存（首次调用时按默认配置创建）
+
+    Returns:
+        ResponseCache
+    """
+    global _llm_cache
+
+    if _llm_cache is None:
+        from .config import Config
+        config = Config()
+        with _cache_lock:
+            if _llm_cache is None:
+                _llm_cache = _llm_cache_from_config(config)
+    return _llm_cache
@@ -4,17 +4,25 @@
 import typer
 from typing import Optional
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
-from ..config import Config
+from ..config import Config, configure_runtime
 from ..crawler import ArxivCrawler, SemanticScholarCrawler
 from ..llm_client import LLMClient
 from ..storage import PaperStorage
 from ..database import Database
+from ..jobs import JobQueue, STAGE_SUMMARY
 
 console = Console()
 app = typer.Typer(help="Paper-to-Action: 自动化论文爬取与智能摘要工具")
 
 
+@app.callback()
+def main():
+    """按配置文件初始化 HTTP 会话、限流、缓存等共享组件"""
+    configure_runtime()
+
+
 @app.command()
 def interactive():
     """启动交互式界面（默认模式）"""
@@ -32,7 +40,9 @@ def search(
     max_results: int = typer.Option(20, "--max-results", "-n", help="最大结果数"),
     summarize: bool = typer.Option(True, "--summarize/--no-summarize", help="是否生成 AI 摘要"),
     output_format: str = typer.Option("markdown", "--format", "-f", help="输出格式 (json/markdown/both)"),
-    save_db: bool = typer.Option(True, "--save-db/--no-save-db", help="是否保存到数据库")
+    save_db: bool = typer.Option(True, "--save-db/--no-save-db", help="是否保存到数据库"),
+    use_cache: bool = typer.Option(True, "--cache/--no-cache", help="是否使用本地响应缓存"),
+    incremental: bool = typer.Option(False, "--incremental/--full", help="只抓取上次运行之后的新论文")
 ):
     """直接搜索论文（非交互模式）"""
     config = Config()
@@ -51,25 +61,50 @@ def search(
         console.print(f"[red]未知数据源: {source}[/red]")
         raise typer.Exit(1)
 
+    # 增量模式：读取上次运行的水位线
+    db = Database() if (save_db or incremental) else None
+    query_key = Database.make_query_key(source.lower(), keywords)
+    watermark = db.get_watermark(query_key) if incremental else None
+    if watermark:
+        console.print(f"[cyan]⏩ 增量模式：只抓取 {watermark['last_published']} 之后的新论文[/cyan]")
+
     # 搜索论文
     papers = crawler.search_papers(
         keywords=keywords,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        use_cache=use_cache,
+        watermark=watermark
     )
     
     if not papers:
         console.print("[yellow]未找到相关论文[/yellow]")
         raise typer.Exit(0)
     
-    # 生成摘要
+    # 持久化本批任务，中断后可通过 resume 命令继续
+    jobs = None
+    if db is not None:
+        jobs = JobQueue.create(db, keywords, papers, params=JobQueue.make_params(
+            language=config.get("language", "zh"),
+            output_format=output_format,
+            save_db=save_db
+        ))
+    
+    # 生成摘要（数据库中已有摘要的论文直接复用）
     if summarize:
+        if db is not None:
+            db.fill_ai_summaries(papers)
+            jobs.enqueue(STAGE_SUMMARY)
         llm_client = LLMClient(
             api_key=config.get("api_key"),
             base_url=config.get("base_url"),
-            model=config.get("model")
+            model=config.get("model"),
+            max_concurrency=int(config.get("llm_max_concurrency", 8))
+        )
+        papers = llm_client.batch_summarize(
+            papers,
+            item_callback=jobs.callback(STAGE_SUMMARY) if jobs else None
         )
-        papers = llm_client.batch_summarize(papers)
     
     # 保存结果
     storage = PaperStorage(output_dir=str(config.get_output_dir()))
@@ -82,24 +117,156 @@ def search(
 
     # 保存到数据库
     if save_db:
-        db = Database()
-        count = 0
-        for paper in papers:
-            if db.add_paper(paper) != -1:
-                count += 1
-        console.print(f"[green]✓ 已保存 {count} 篇论文到数据库[/green]")
+        result = db.add_papers(papers)
+        console.print(
+            f"[green]✓ 已保存 {result.inserted + result.updated} 篇论文到数据库"
+            f"（新增 {result.inserted}，更新 {result.updated}）[/green]"
+        )
+        if result.failed:
+            console.print(f"[yellow]⚠ {result.failed} 篇论文缺少 ID 或标题，未保存[/yellow]")
+
+    # 所有阶段完成后再推进水位线，中途失败时下次会重新处理
+    if incremental and not db.update_watermark(query_key, source.lower(), keywords, papers,
+                                               truncated=crawler.truncated):
+        console.print(f"[yellow]⚠ 结果数达到上限 {max_results}，上次水位线之后的论文未取全；"
+                      f"水位线保持不变，可增大 --max-results 后重试[/yellow]")
+    if jobs:
+        jobs.finish()
     
     console.print(f"\n[green]✓ 成功处理 {len(papers)} 篇论文！[/green]")
 
 
+@app.command()
+def resume(
+    batch_id: Optional[str] = typer.Argument(None, help="批次 ID（默认为最近一个未完成的批次）"),
+    output_format: Optional[str] = typer.Option(None, "--format", "-f", help="输出格式 (json/markdown/both)")
+):
+    """继续上次中断的摘要/标签/下载任务"""
+    config = Config()
+    db = Database()
+    batches = db.get_unfinished_job_batches()
+    
+    if not batches:
+        console.print("[green]没有未完成的任务[/green]")
+        return
+    
+    table = Table(title="未完成的任务")
+    table.add_column("批次", style="cyan", no_wrap=True)
+    table.add_column("说明", style="magenta")
+    table.add_column("创建时间", style="blue")
+    table.add_column("进度", style="green")
+    for batch in batches:
+        progress = ", ".join(
+            f"{stage} {counts.get('done', 0)}/{sum(counts.values())}"
+            for stage, counts in batch['counts'].items()
+        )
+        table.add_row(batch['id'], batch['label'] or "", batch['created_at'], progress)
+    console.print(table)
+    
+    jobs = JobQueue.load(db, batch_id or batches[0]['id'])
+    if jobs is None:
+        console.print(f"[red]未找到批次: {batch_id}[/red]")
+        raise typer.Exit(1)
+    
+    console.print(f"[cyan]⏯  继续批次 {jobs.batch_id}（{len(jobs.papers)} 篇论文）[/cyan]")
+    papers = jobs.resume(config)
+    
+    # 保存结果
+    output_format = output_format or jobs.params.get('output_format', 'markdown')
+    storage = PaperStorage(output_dir=str(config.get_output_dir()))
+    if output_format in ["json", "both"]:
+        storage.save_papers_json(papers)
+    if output_format in ["markdown", "both"]:
+        storage.save_papers_markdown(papers)
+    if jobs.params.get('save_db'):
+        db.add_papers(papers)
+    
+    remaining = jobs.remaining()
+    if remaining:
+        console.print(f"\n[yellow]⚠ 仍有 {remaining} 个任务未完成，可再次运行 resume 继续[/yellow]")
+        return
+    
+    jobs.finish()
+    console.print(f"\n[green]✓ 批次 {jobs.batch_id} 已完成！[/green]")
+
+
+@app.command()
+def extract(
+    force: bool = typer.Option(False, "--force", help="忽略已有结果，全部重新提取"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="进程数（默认读取配置，0 为全部核心）")
+):
+    """提取已下载 PDF 的全文"""
+    from concurrent.futures.process import BrokenProcessPool
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+    from ..extractor import TextExtractor
+    
+    config = Config()
+    if workers is None:
+        workers = int(config.get("extract_max_workers", 0))
+    extractor = TextExtractor(Database(), max_workers=workers)
+    
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+    ) as progress:
+        task = progress.add_task("[cyan]📄 正在提取全文...[/cyan]", total=None)
+        completed = [0]
+        
+        def update_progress(current, total):
+            completed[0] = current
+            progress.update(task, completed=current, total=total)
+        
+        try:
+            stats = extractor.extract_all(force=force, progress_callback=update_progress)
+        except BrokenProcessPool:
+            stats = None
+    
+    if stats is None:
+        # 已完成的结果在异常前已写入数据库，剩余的 PDF 下次运行时继续提取
+        console.print(
+            f"[red]✗ 提取进程异常退出（可能是内存不足或 PDF 导致崩溃）。"
+            f"已处理 {completed[0]} 篇，剩余 {len(extractor.pending())} 篇未提取，可再次运行 extract 继续[/red]"
+        )
+        raise typer.Exit(1)
+    
+    console.print(
+        f"[green]✓ 提取 {stats.extracted} 篇，跳过 {stats.skipped} 篇未变化的 PDF，"
+        f"失败 {stats.failed} 篇[/green]"
+    )
+    if stats.missing:
+        console.print(f"[yellow]⚠ {stats.missing} 篇 PDF 已不在下载位置，未提取[/yellow]")
+
+
 @app.command()
 def list(
     favorite: bool = typer.Option(False, "--favorite", "-fav", help="只显示收藏的论文"),
-    limit: int = typer.Option(20, "--limit", "-l", help="显示数量限制")
+    read: Optional[bool] = typer.Option(None, "--read/--unread", help="只显示已读/未读的论文"),
+    source: Optional[str] = typer.Option(None, "--source", "-src", help="数据源"),
+    tag: Optional[str] = typer.Option(None, "--tag", "-t", help="标签"),
+    author: Optional[str] = typer.Option(None, "--author", "-a", help="作者（不区分大小写）"),
+    category: Optional[str] = typer.Option(None, "--category", "-c", help="分类，如 cs.LG"),
+    since: Optional[str] = typer.Option(None, "--since", "-s", help="发表日期下限 (YYYY-MM-DD)"),
+    until: Optional[str] = typer.Option(None, "--until", "-u", help="发表日期上限 (YYYY-MM-DD)"),
+    limit: int = typer.Option(20, "--limit", "-l", help="显示数量限制"),
+    after: Optional[str] = typer.Option(None, "--after", help="从上一页末尾的游标继续")
 ):
     """列出数据库中的论文"""
     db = Database()
-    papers = db.get_all_papers(filter_favorite=favorite)
+    filters = {
+        'favorite': True if favorite else None, 'read': read,
+        'source': source, 'tag': tag, 'author': author, 'category': category,
+        'since': since, 'until': until
+    }
+    try:
+        papers, next_cursor = db.query_papers(
+            filters=filters, limit=limit, after=after,
+            fields=['id', 'title', 'authors', 'published', 'is_favorite']
+        )
+    except ValueError:
+        console.print(f"[red]✗ 无效的分页游标：{escape(after)}，请使用上一页末尾提示的 --after 值[/red]")
+        raise typer.Exit(1)
     
     if not papers:
         console.print("[yellow]数据库中没有论文[/yellow]")
@@ -112,12 +279,53 @@ def list(
     table.add_column("日期", style="blue")
     table.add_column("收藏", justify="center")
 
-    for paper in papers[:limit]:
+    for paper in papers:
         fav_icon = "⭐" if paper['is_favorite'] else ""
         authors = ", ".join(paper['authors'][:2]) + ("..." if len(paper['authors']) > 2 else "")
         table.add_row(str(paper['id']), paper['title'], authors, paper['published'], fav_icon)
 
     console.print(table)
+    if next_cursor:
+        console.print(f"[dim]下一页：paper-seek list --after '{next_cursor}'[/dim]")
+
+
+@app.command()
+def find(
+    query: str = typer.Argument(..., help="检索词（支持 AND/OR/NOT、\"短语\"、前缀*）"),
+    favorite: bool = typer.Option(False, "--favorite", "-fav", help="只搜索收藏的论文"),
+    source: Optional[str] = typer.Option(None, "--source", "-src", help="数据源"),
+    tag: Optional[str] = typer.Option(None, "--tag", "-t", help="标签"),
+    author: Optional[str] = typer.Option(None, "--author", "-a", help="作者（不区分大小写）"),
+    category: Optional[str] = typer.Option(None, "--category", "-c", help="分类，如 cs.LG"),
+    since: Optional[str] = typer.Option(None, "--since", "-s", help="发表日期下限 (YYYY-MM-DD)"),
+    until: Optional[str] = typer.Option(None, "--until", "-u", help="发表日期上限 (YYYY-MM-DD)"),
+    limit: int = typer.Option(20, "--limit", "-l", help="显示数量限制"),
+    offset: int = typer.Option(0, "--offset", help="跳过前 N 条结果")
+):
+    """全文检索数据库中的论文（按相关度排序）"""
+    db = Database()
+    filters = {
+        'favorite': True if favorite else None, 'source': source, 'tag': tag,
+        'author': author, 'category': category, 'since': since, 'until': until
+    }
+    papers = db.search(query, filters=filters, limit=limit, offset=offset)
+
+    if not papers:
+        console.print(f"[yellow]没有找到与 “{query}” 相关的论文[/yellow]")
+        return
+
+    table = Table(title=f"检索结果：{query}")
+    table.add_column("ID", justify="right", style="cyan", no_wrap=True)
+    table.add_column("标题", style="magenta")
+    table.add_column("作者", style="green")
+    table.add_column("日期", style="blue")
+    table.add_column("匹配片段", style="white")
+
+    for paper in papers:
+        authors = ", ".join(paper['authors'][:2]) + ("..." if len(paper['authors']) > 2 else "")
+        table.add_row(str(paper['id']), paper['title'], authors, paper['published'], escape(paper['snippet'] or ""))
+
+    console.print(table)
 
 
 @app.command()
@@ -165,11 +373,8 @@ def export(
             return
         papers = [paper]
     else:
-        papers = db.get_all_papers()
-    
-    if not papers:
-        console.print("[yellow]没有可导出的论文[/yellow]")
-        return
+        # 逐批读取，不把整个库的行先读进内存
+        papers = db.iter_papers(fields=['id', 'title', 'authors', 'published', 'source', 'source_id', 'pdf_url', 'url', 'doi'])
 
     from ..export.citation import CitationExporter
     
@@ -186,12 +391,17 @@ def export(
             source=p.get('source', 'arxiv'),
             source_id=p.get('source_id', str(p['id'])),
             url=p.get('url'),
-            pdf_url=p.get('pdf_url')
+            pdf_url=p.get('pdf_url'),
+            doi=p.get('doi')
         )
         paper_objs.append(paper_obj)
 
+    if not paper_objs:
+        console.print("[yellow]没有可导出的论文[/yellow]")
+        return
+
     output_dir = Config().get_output_dir() / "citations"
-    CitationExporter.export_all_formats(paper_objs, str(output_dir))
+    CitationExporter.export_all_formats(paper_objs, str(output_dir), manifest=db)
     
     console.print(f"[green]✓ 引用已导出到 {output_dir}[/green]")
 
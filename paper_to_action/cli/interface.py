@@ -13,10 +13,13 @@ from rich import box
 from rich.live import Live
 import sys
 import time
-from ..config import Config
+from ..config import configure_runtime
 from ..crawler import ArxivCrawler
 from ..llm_client import LLMClient
 from ..storage import PaperStorage
+from ..database import Database
+from ..jobs import JobQueue, STAGE_ANALYSIS, STAGE_SUMMARY, STAGE_DOWNLOAD
+from ..persistence import PersistenceWriter
 from ..i18n import get_i18n, set_language
 
 console = Console()
@@ -27,7 +30,7 @@ class PaperSeekCLI:
     
     def __init__(self):
         """初始化 CLI"""
-        self.config = Config()
+        self.config = configure_runtime()
         self.crawler = None
         self.llm_client = None
         self.storage = None
@@ -293,6 +296,12 @@ class PaperSeekCLI:
         # Whether to generate AI summary
         generate_summary = Confirm.ask(self.i18n.get("search_generate_summary"), default=True)
         
+        # 摘要和标签一起生成时每篇论文只需一次请求，因此提前询问
+        generate_tags = generate_summary and Confirm.ask(
+            f"[cyan]🏷️  是否为论文生成AI标签?[/cyan]",
+            default=True
+        )
+        
         # 数据源选择
         console.print(f"\n[bold cyan]📚 选择数据源:[/bold cyan]\n")
       
@@ -338,7 +347,8 @@ class PaperSeekCLI:
             source_names=selected_sources,
             max_results=max_results,
             start_date=start_date if start_date else None,
-            end_date=end_date if end_date else None
+            end_date=end_date if end_date else None,
+            enrich=True
         )
         
         # 转换为 dict 格式（保持向后兼容）
@@ -354,12 +364,25 @@ class PaperSeekCLI:
         # Display preview of papers
         self._display_paper_preview(papers[:3])  # Show first 3
         
+        # 持久化本批任务，中断后可通过 paper-seek resume 继续
+        db = Database()
+        # 入库、任务结果和结果文件交给后台线程写入，各阶段不等待磁盘
+        writer = PersistenceWriter(db, max_pending=int(self.config.get("persist_queue_size", 256)))
+        # 交互式搜索的结果总会入库，格式在最后选择前按默认值记录
+        jobs = JobQueue.create(db, keywords, papers, params=JobQueue.make_params(
+            language=self.config.get("language", "zh"),
+            save_db=True
+        ), writer=writer)
+        writer.add_papers(papers)
+        
         # Generate AI summary
         if generate_summary:
             self.llm_client = LLMClient(
                 api_key=self.config.get("api_key"),
                 base_url=self.config.get("base_url"),
-                model=self.config.get("model")
+                model=self.config.get("model"),
+                max_concurrency=int(self.config.get("llm_max_concurrency", 8)),
+                pack_token_budget=int(self.config.get("llm_pack_token_budget", 4000))
             )
             
             with Progress(
@@ -377,11 +400,20 @@ class PaperSeekCLI:
                 def update_progress(current):
                     progress.update(task, completed=current)
                 
+                summary_stage = STAGE_ANALYSIS if generate_tags else STAGE_SUMMARY
+                jobs.enqueue(summary_stage)
                 papers = self.llm_client.batch_summarize(
                     papers,
                     language=self.config.get("language", "zh"),
-                    progress_callback=update_progress
+                    progress_callback=update_progress,
+                    with_tags=generate_tags,
+                    max_tags=5,
+                    item_callback=jobs.callback(summary_stage)
                 )
+            
+            # 摘要阶段结束：保存 AI 摘要并立即写出本阶段结果
+            writer.add_papers(papers)
+            writer.flush(wait=False)
         
         # PDF 下载功能
         download_pdf = Confirm.ask(
@@ -393,8 +425,14 @@ class PaperSeekCLI:
             from ..pdf_downloader import PDFDownloader
             
             pdf_downloader = PDFDownloader(
-                output_dir=str(self.config.get_output_dir() / "pdfs")
+                output_dir=str(self.config.get_output_dir() / "pdfs"),
+                max_workers=int(self.config.get("pdf_max_workers", 4)),
+                per_host_limit=int(self.config.get("pdf_per_host_limit", 2)),
+                max_bandwidth=float(self.config.get("pdf_max_bandwidth_kb", 0)) * 1024 or None,
+                manifest=db
             )
+            jobs.set_params(pdf_dir=pdf_downloader.output_dir)
+            jobs.enqueue(STAGE_DOWNLOAD)
             
             console.print()
             with Progress(
@@ -415,40 +453,13 @@ class PaperSeekCLI:
                 # 批量下载
                 download_stats = pdf_downloader.batch_download(
                     papers,
-                    progress_callback=update_download_progress
+                    progress_callback=update_download_progress,
+                    item_callback=jobs.callback(STAGE_DOWNLOAD)
                 )
             
             # 显示下载报告
             pdf_downloader.print_download_report(download_stats)
-        
-        # 标签生成功能（新增）
-        if generate_summary:  # 如果生成了摘要，询问是否生成标签
-            generate_tags = Confirm.ask(
-                f"\n[cyan]🏷️  是否为论文生成AI标签?[/cyan]",
-                default=True
-            )
-            
-            if generate_tags:
-                console.print()
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[progress.description]{task.description}"),
-                    BarColumn(),
-                    TaskProgressColumn(),
-                ) as progress:
-                    task = progress.add_task(
-                        f"[cyan]🏷️  正在生成标签...[/cyan]",
-                        total=len(papers)
-                    )
-                    
-                    def update_tag_progress(current):
-                        progress.update(task, completed=current)
-                    
-                    papers = self.llm_client.batch_generate_tags(
-                        papers,
-                        max_tags=5,
-                        progress_callback=update_tag_progress
-                    )
+            writer.flush(wait=False)
         
         # 引用格式导出（新增）
         export_citations = Confirm.ask(
@@ -460,7 +471,7 @@ class PaperSeekCLI:
             from ..export.citation import CitationExporter
             
             output_dir = str(self.config.get_output_dir() / "citations")
-            saved_files = CitationExporter.export_all_formats(papers, output_dir)
+            saved_files = CitationExporter.export_all_formats(papers, output_dir, manifest=db)
             
             console.print(f"\n[green]✓ 引用格式已导出:[/green]")
             for f in saved_files:
@@ -472,28 +483,17 @@ class PaperSeekCLI:
             default=False
         )
         
+        favorite_results = []
         if add_to_favorites:
-            import os
             from ..favorites import FavoriteManager
             
-            fav_manager = FavoriteManager(str(self.config.get_output_dir()))
-            added_count = 0
+            fav_manager = FavoriteManager(str(self.config.get_output_dir()), manifest=db)
             
-            for paper in papers:
-                # 如果下载了PDF，添加路径信息
-                if download_pdf and 'source_id' in paper:
-                    pdf_filename = pdf_downloader.sanitize_filename(
-                        paper.get('title', ''),
-                        paper.get('source_id', '')
-                    )
-                    pdf_path = pdf_downloader.output_dir + "/" + pdf_filename
-                    if os.path.exists(pdf_path):
-                        paper['pdf_path'] = pdf_path
-                
-                if fav_manager.add_favorite(paper):
-                    added_count += 1
+            # 从下载清单中补全 PDF 路径
+            db.fill_pdf_paths(papers)
             
-            console.print(f"\n[green]✓ 已添加 {added_count} 篇论文到收藏夹[/green]")
+            # 收藏文件在后台写入，数量在全部写完后汇总
+            favorite_results = [writer.call(fav_manager.add_favorite, dict(paper)) for paper in papers]
         
         # Save results
         self.storage = PaperStorage(output_dir=str(self.config.get_output_dir()))
@@ -503,13 +503,24 @@ class PaperSeekCLI:
             choices=["json", "markdown", "both"],
             default="markdown"
         )
+        jobs.set_params(output_format=save_format)
         
+        snapshot = [dict(paper) for paper in papers]
         if save_format in ["json", "both"]:
-            self.storage.save_papers_json(papers)
+            writer.call(self.storage.save_papers_json, snapshot)
         
         if save_format in ["markdown", "both"]:
-            self.storage.save_papers_markdown(papers)
+            writer.call(self.storage.save_papers_markdown, snapshot)
         
+        # 等待后台写入完成后再结束批次
+        jobs.finish()
+        writer.close()
+        if writer.errors:
+            console.print(f"\n[yellow]⚠ 后台写入有 {writer.errors} 项失败，详见上方错误信息[/yellow]")
+        
+        if add_to_favorites:
+            added_count = sum(1 for f in favorite_results if f.exception() is None and f.result())
+            console.print(f"\n[green]✓ 已添加 {added_count} 篇论文到收藏夹[/green]")
         console.print(f"\n[bright_green]{self.i18n.get('search_success', count=len(papers))}[/bright_green]")
     
     def _display_paper_preview(self, papers):
@@ -22,7 +22,34 @@ class Config:
         "max_results": 20,
         "default_keywords": "",
         "language": "zh",
-        "output_dir": "papers"
+        "output_dir": "papers",
+        # HTTP 连接池与传输层重试
+        "http_pool_connections": 10,
+        "http_pool_maxsize": 10,
+        "http_max_retries": 3,
+        "http_backoff_factor": 1.0,
+        # 数据源响应缓存
+        "cache_enabled": True,
+        "cache_ttl": 21600,
+        "cache_max_mb": 200,
+        # 各上游主机的请求速率（请求/秒），未列出的使用内置默认值
+        "rate_limits": {},
+        "llm_requests_per_second": 5.0,
+        # 批量摘要/标签生成时同时进行的 LLM 请求数
+        "llm_max_concurrency": 8,
+        # LLM 结果缓存（按模型、语言、提示词版本和论文内容寻址）
+        "llm_cache_enabled": True,
+        "llm_cache_max_mb": 100,
+        # 打包标签请求的 token 预算，0 表示每篇论文单独请求
+        "llm_pack_token_budget": 4000,
+        # PDF 批量下载：并发线程数、单主机并发上限、总带宽上限（KB/s，0 为不限）
+        "pdf_max_workers": 4,
+        "pdf_per_host_limit": 2,
+        "pdf_max_bandwidth_kb": 0,
+        # PDF 全文提取的进程数，0 表示使用全部 CPU 核心
+        "extract_max_workers": 0,
+        # 后台写入队列的长度上限，写入跟不上时搜索/摘要/下载会暂停等待
+        "persist_queue_size": 256
     }
     
     def __init__(self, config_path: Optional[str] = None):
@@ -153,3 +180,30 @@ class Config:
             语言代码 ('zh' 或 'en')
         """
         return self.get("language", "zh")
+
+
+def configure_runtime(config: Optional[Config] = None) -> Config:
+    """
+    按配置重建全局共享组件：HTTP 会话、限流器、响应缓存、LLM 缓存和 PDF 存储
+
+    各组件首次使用时会自行加载默认配置；入口处调用本函数，使传入的配置
+    （如脚本指定的输出目录）对全部组件生效。
+
+    Args:
+        config: Config 实例，None 表示加载默认配置
+
+    Returns:
+        使用的 Config
+    """
+    from .blob_store import configure_blob_store
+    from .cache import configure_cache, configure_llm_cache
+    from .http_client import configure_http
+    from .rate_limit import configure_rate_limiter
+
+    config = config or Config()
+    configure_rate_limiter(config)
+    configure_http(config)
+    configure_cache(config)
+    configure_llm_cache(config)
+    configure_blob_store(config)
+    return config
@@ -3,11 +3,12 @@ Paper Crawler Module
 Supports multiple sources (ArXiv, etc.)
 """
 import arxiv
-import requests
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import List, Dict, Optional
 from rich.console import Console
+from .cache import get_response_cache
+from .http_client import get_session
 
 console = Console()
 
@@ -16,6 +17,9 @@ class BaseCrawler(ABC):
     
     def __init__(self, max_results: int = 50):
         self.max_results = max_results
+        # Set by search_papers(): True when max_results cut the result window
+        # short, so papers older than the last one returned were not fetched
+        self.truncated = False
         
     @abstractmethod
     def search_papers(self, keywords: str, start_date: Optional[str] = None, end_date: Optional[str] = None, **kwargs) -> List[Dict]:
@@ -28,6 +32,20 @@ class BaseCrawler(ABC):
 class ArxivCrawler(BaseCrawler):
     """ArXiv Crawler Implementation"""
     
+    def _client(self) -> arxiv.Client:
+        # Pacing is handled by the shared rate limiter, so disable the
+        # library's own fixed delay and route it through the pooled session.
+        # arxiv.Client has no public hook for its session: _session is private
+        # (present in 2.x-4.x, pinned in requirements.txt). If an upgrade drops
+        # it, keep the library's own delay rather than silently losing pacing.
+        client = arxiv.Client(delay_seconds=0)
+        if not hasattr(client, '_session'):
+            console.print("[yellow]⚠ arxiv.Client no longer exposes _session; "
+                          "falling back to its built-in request delay[/yellow]")
+            return arxiv.Client()
+        client._session = get_session()
+        return client
+    
     def search_papers(
         self,
         keywords: str,
@@ -37,6 +55,9 @@ class ArxivCrawler(BaseCrawler):
         **kwargs
     ) -> List[Dict]:
         console.print(f"[cyan]🔍 Searching ArXiv for: {keywords}[/cyan]")
+        use_cache = kwargs.get('use_cache', True)
+        watermark = kwargs.get('watermark')
+        seen_ids = watermark.get('seen_ids', set()) if watermark else set()
         
         query_parts = []
         if keywords:
@@ -50,8 +71,32 @@ class ArxivCrawler(BaseCrawler):
         if category:
             query_parts.append(f'cat:{category}')
         
+        # Parse date bounds once and push them into the query
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        
+        # Incremental runs only need submissions since the last watermark
+        if watermark and watermark.get('last_published'):
+            since = datetime.strptime(watermark['last_published'][:10], "%Y-%m-%d").date()
+            start = max(start, since) if start else since
+        
+        if start or end:
+            range_start = start.strftime("%Y%m%d0000") if start else "199101010000"
+            range_end = (end or datetime.now().date()).strftime("%Y%m%d2359")
+            query_parts.append(f"submittedDate:[{range_start} TO {range_end}]")
+        
         query = " AND ".join(query_parts)
         
+        cache = get_response_cache()
+        cache_key = cache.make_key('arxiv_crawler', query, self.max_results, sorted(seen_ids))
+        if use_cache:
+            cached = cache.get_json(cache_key)
+            if cached is not None:
+                console.print(f"[green]✓ Found {len(cached)} papers from ArXiv (cached)[/green]")
+                # The cache does not record how the window ended; assume the worst
+                self.truncated = len(cached) >= self.max_results
+                return cached
+        
         search = arxiv.Search(
             query=query,
             max_results=self.max_results,
@@ -60,18 +105,24 @@ class ArxivCrawler(BaseCrawler):
         )
         
         papers = []
-        for result in search.results():
+        fetched = 0
+        window_exhausted = False
+        for result in self._client().results(search):
+            fetched += 1
             paper_date = result.published.date()
             
-            if start_date:
-                start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                if paper_date < start:
-                    continue
+            # Results are sorted by submission date (descending): once we are
+            # past the start of the window, no later page can match
+            if start and paper_date < start:
+                window_exhausted = True
+                break
             
-            if end_date:
-                end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                if paper_date > end:
-                    continue
+            if end and paper_date > end:
+                continue
+            
+            arxiv_id = result.entry_id.split('/')[-1]
+            if arxiv_id in seen_ids:
+                continue
             
             paper = {
                 "source": "arxiv",
@@ -79,20 +130,25 @@ class ArxivCrawler(BaseCrawler):
                 "authors": [author.name for author in result.authors],
                 "summary": result.summary.replace('\n', ' '),
                 "pdf_url": result.pdf_url,
-                "arxiv_id": result.entry_id.split('/')[-1],
+                "arxiv_id": arxiv_id,
                 "published": paper_date.strftime("%Y-%m-%d"),
                 "categories": result.categories,
                 "primary_category": result.primary_category
             }
             papers.append(paper)
         
+        self.truncated = not window_exhausted and fetched >= self.max_results
+        
+        if use_cache:
+            cache.set_json(cache_key, papers)
+        
         console.print(f"[green]✓ Found {len(papers)} papers from ArXiv[/green]")
         return papers
     
     def get_paper_by_id(self, paper_id: str) -> Optional[Dict]:
         search = arxiv.Search(id_list=[paper_id])
         try:
-            result = next(search.results())
+            result = next(self._client().results(search))
             return {
                 "source": "arxiv",
                 "title": result.title,
@@ -120,6 +176,10 @@ class SemanticScholarCrawler(BaseCrawler):
         **kwargs
     ) -> List[Dict]:
         console.print(f"[cyan]🔍 Searching Semantic Scholar for: {keywords}[/cyan]")
+        use_cache = kwargs.get('use_cache', True)
+        watermark = kwargs.get('watermark')
+        since = watermark.get('last_published') if watermark else None
+        seen_ids = watermark.get('seen_ids', set()) if watermark else set()
         
         params = {
             "query": keywords,
@@ -134,24 +194,31 @@ class SemanticScholarCrawler(BaseCrawler):
             end_year = end_date.split('-')[0] if end_date else datetime.now().year
             params["year"] = f"{start_year}-{end_year}"
 
+        if since:
+            # Only fetch papers published on or after the last watermark
+            params["publicationDateOrYear"] = f"{since[:10]}:"
+
         try:
-            response = requests.get(self.BASE_URL, params=params)
-            response.raise_for_status()
-            data = response.json()
+            cache = get_response_cache()
+            cache_key = cache.make_key('semantic_scholar', self.BASE_URL, params)
+            data = cache.get_json(cache_key) if use_cache else None
             
+            if data is None:
+                response = get_session().get(self.BASE_URL, params=params, timeout=30)
+                response.raise_for_status()
+                data = response.json()
+                if use_cache:
+                    cache.set(cache_key, response.content)
+            
+            items = data.get('data', [])
+            # Results are ranked by relevance, so a full page may have left newer papers out
+            self.truncated = len(items) >= self.max_results
             papers = []
-            for item in data.get('data', []):
-                paper = {
-                    "source": "semantic_scholar",
-                    "title": item.get('title'),
-                    "authors": [a['name'] for a in item.get('authors', [])],
-                    "summary": item.get('abstract'),
-                    "pdf_url": item.get('url'), # Might not be direct PDF
-                    "source_id": item.get('paperId'),
-                    "published": item.get('publicationDate'),
-                    "categories": [] # Semantic scholar doesn't give categories easily in search
-                }
-                papers.append(paper)
+            for item in items:
+                published = item.get('publicationDate')
+                if item.get('paperId') in seen_ids or (since and published and published < since):
+                    continue
+                papers.append(self._to_dict(item))
                 
             console.print(f"[green]✓ Found {len(papers)} papers from Semantic Scholar[/green]")
             return papers
@@ -161,5 +228,45 @@ class SemanticScholarCrawler(BaseCrawler):
             return []
 
     def get_paper_by_id(self, paper_id: str) -> Optional[Dict]:
-        # Implementation for fetching by ID
-        pass
+        papers = self.get_papers_by_ids([paper_id])
+        return papers[0] if papers else None
+
+    def get_papers_by_ids(self, paper_ids: List[str]) -> List[Optional[Dict]]:
+        """
+        Look up many papers at once via the /paper/batch endpoint.
+
+        IDs may mix S2 paper IDs, "ArXiv:<id>" and "DOI:<doi>" identifiers;
+        the result is aligned with the input and holds None for misses.
+        """
+        from .sources.semantic_scholar import SemanticScholarSource
+        
+        papers = []
+        for paper in SemanticScholarSource().get_details_batch(paper_ids):
+            if paper is None:
+                papers.append(None)
+                continue
+            papers.append({
+                "source": "semantic_scholar",
+                "title": paper.title,
+                "authors": paper.authors,
+                "summary": paper.abstract,
+                "pdf_url": paper.pdf_url or paper.url,
+                "source_id": paper.source_id,
+                "published": paper.published,
+                "doi": paper.doi,
+                "citations": paper.citations,
+                "categories": []
+            })
+        return papers
+
+    def _to_dict(self, item: Dict) -> Dict:
+        return {
+            "source": "semantic_scholar",
+            "title": item.get('title'),
+            "authors": [a['name'] for a in item.get('authors', [])],
+            "summary": item.get('abstract'),
+            "pdf_url": item.get('url'), # Might not be direct PDF
+            "source_id": item.get('paperId'),
+            "published": item.get('publicationDate'),
+            "categories": [] # Semantic scholar doesn't give categories easily in search
+        }
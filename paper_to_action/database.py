@@ -4,26 +4,206 @@ Handles storage of papers, tags, notes, and favorites using SQLite.
 """
 import sqlite3
 import json
+import threading
+import zlib
+from collections.abc import Mapping
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from dataclasses import dataclass, field
+from typing import List, Dict, Iterable, Iterator, Optional, Any, Tuple
 from rich.console import Console
 
 console = Console()
 
+
+@dataclass
+class BulkResult:
+    """Outcome of Database.add_papers."""
+    inserted: int
+    updated: int
+    failed: int
+    ids: List[Optional[int]] = field(default_factory=list)
+
+
+def _decode_text(value):
+    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else value
+
+
+# Columns converted on first access rather than when the row is fetched
+_PAPER_DECODERS = {
+    'authors': lambda value: json.loads(value) if value else [],
+    'summary': _decode_text,
+    'ai_summary': _decode_text,
+    'is_favorite': bool,
+    'read_status': bool
+}
+
+
+class PaperRow(Mapping):
+    """
+    A paper as returned by Database queries.
+
+    Wraps the raw row tuple and a field-name index shared by every row of
+    the same query, so a row costs little more than the tuple itself.
+    authors is JSON-decoded, summary/ai_summary are UTF-8 decoded and the
+    flags become bool only when first read. Reads like the dict it
+    replaces; keys assigned later (score, pdf_path, ...) are kept
+    alongside the columns. Use to_dict() for a plain dict, e.g. for JSON.
+    """
+    __slots__ = ('_index', '_values', '_cache')
+
+    def __init__(self, index: Dict[str, int], values: tuple):
+        self._index = index
+        self._values = values
+        self._cache = None
+
+    def __getitem__(self, key):
+        cache = self._cache
+        if cache is not None and key in cache:
+            return cache[key]
+        value = self._values[self._index[key]]
+        decode = _PAPER_DECODERS.get(key)
+        if decode is None:
+            return value
+        value = decode(value)
+        if cache is None:
+            self._cache = cache = {}
+        cache[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if self._cache is None:
+            self._cache = {}
+        self._cache[key] = value
+
+    def __contains__(self, key):
+        return key in self._index or (self._cache is not None and key in self._cache)
+
+    def __iter__(self):
+        yield from self._index
+        if self._cache is not None:
+            for key in self._cache:
+                if key not in self._index:
+                    yield key
+
+    def __len__(self):
+        extra = 0 if self._cache is None else sum(1 for key in self._cache if key not in self._index)
+        return len(self._index) + extra
+
+    def __repr__(self):
+        return f"PaperRow({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+
 class Database:
+    # Prepared statements kept per connection; covers every query in this class
+    CACHED_STATEMENTS = 256
+
     def __init__(self, db_path: str = "paper_robot.db"):
         self.db_path = db_path
+        # One long-lived connection shared by all threads; the lock serializes
+        # access and transaction() groups writes into a single commit.
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = self._connect()
         self._init_db()
 
-    def _get_connection(self):
-        return sqlite3.connect(self.db_path)
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: statements autocommit unless inside transaction()
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=self.CACHED_STATEMENTS
+        )
+        # WAL lets readers in other processes proceed during writes; with WAL,
+        # synchronous=NORMAL only fsyncs at checkpoints and stays crash-safe.
+        if self.db_path != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-16000')  # ~16 MB page cache
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA busy_timeout=5000')
+        return conn
+
+    def close(self):
+        """
+        Checkpoint the WAL into the main file and close the shared
+        connection, leaving a single self-contained database file.
+        """
+        with self._lock:
+            try:
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except sqlite3.Error:
+                pass
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block of writes as one transaction and yield a cursor.
+
+        Nested calls become savepoints, so methods that open their own
+        transaction can be combined into a larger one by the caller, e.g.
+        `with db.transaction(): for p in papers: db.add_paper(p)` commits once.
+        """
+        with self._lock:
+            savepoint = f"sp{self._depth}"
+            self._conn.execute('BEGIN' if self._depth == 0 else f'SAVEPOINT {savepoint}')
+            self._depth += 1
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute('ROLLBACK')
+                else:
+                    self._conn.execute(f'ROLLBACK TO {savepoint}')
+                    self._conn.execute(f'RELEASE {savepoint}')
+                raise
+            else:
+                self._depth -= 1
+                self._conn.execute('COMMIT' if self._depth == 0 else f'RELEASE {savepoint}')
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _cursor(self):
+        """Yield a cursor on the shared connection for reads."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    # Schema migrations in order; PRAGMA user_version records how many have run
+    MIGRATIONS = ('_create_tables', '_add_paper_metadata', '_add_work_tables')
 
     def _init_db(self):
-        """Initialize database tables"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
+        """Initialize database tables, upgrading older databases in place"""
+        for version, name in enumerate(self.MIGRATIONS, 1):
+            with self.transaction() as cursor:
+                # Checked inside the transaction in case another process just migrated
+                cursor.execute('PRAGMA user_version')
+                if cursor.fetchone()[0] >= version:
+                    continue
+                getattr(self, name)(cursor)
+                cursor.execute(f'PRAGMA user_version = {version}')
+
+        with self._cursor() as cursor:
+            self.fts_enabled = self._init_fts(cursor)
+
+    def _create_tables(self, cursor):
+        """
+        Version 1: the original schema of papers, tags and notes (databases
+        created before versioning are already here). The full-text index is
+        not a migration; _init_fts() creates it on every start.
+        """
         # Papers table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS papers (
@@ -74,150 +254,977 @@ class Database:
             FOREIGN KEY(paper_id) REFERENCES papers(id)
         )
         ''')
+
+    def _add_paper_metadata(self, cursor):
+        """
+        Version 2: store DOI, URL and citation count on papers, and normalize
+        authors and categories into their own tables so lookups by either are
+        index seeks. Authors of existing papers are backfilled from the JSON
+        column, which stays as the display copy.
+        """
+        cursor.execute('ALTER TABLE papers ADD COLUMN doi TEXT')
+        cursor.execute('ALTER TABLE papers ADD COLUMN url TEXT')
+        cursor.execute('ALTER TABLE papers ADD COLUMN citations INTEGER')
+        cursor.execute('CREATE INDEX idx_papers_doi ON papers(doi COLLATE NOCASE)')
+
+        for table, link_table, column in self.NAME_TABLES:
+            cursor.execute(f'''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL
+            )
+            ''')
+            cursor.execute(f'''
+            CREATE TABLE {link_table} (
+                paper_id INTEGER NOT NULL,
+                {column} INTEGER NOT NULL,
+                position INTEGER,
+                FOREIGN KEY(paper_id) REFERENCES papers(id),
+                FOREIGN KEY({column}) REFERENCES {table}(id),
+                PRIMARY KEY(paper_id, {column})
+            )
+            ''')
+            # Names are stored as given and matched case-insensitively
+            cursor.execute(f'CREATE INDEX idx_{table}_name ON {table}(name COLLATE NOCASE)')
+            cursor.execute(f'CREATE INDEX idx_{link_table}_{column} ON {link_table}({column}, paper_id)')
+
+        cursor.execute('SELECT id, authors FROM papers WHERE authors IS NOT NULL')
+        links = {}
+        for paper_id, authors in cursor.fetchall():
+            try:
+                links[paper_id] = json.loads(authors)
+            except ValueError:
+                continue
+        self._link_names(cursor, 'authors', links, existing=())
+
+    def _add_work_tables(self, cursor):
+        """
+        Version 3: indexes for the paginated listing, plus the tables behind
+        incremental harvesting, resumable jobs, the download manifest and
+        full-text extraction. Everything is IF NOT EXISTS because earlier
+        builds created these as part of version 1.
+        """
+        # Indexes backing the keyset-paginated listing and its filters
+        # (executed one by one: executescript() would commit the migration early)
+        for statement in (
+            'CREATE INDEX IF NOT EXISTS idx_papers_added ON papers(added_date, id)',
+            'CREATE INDEX IF NOT EXISTS idx_papers_source_added ON papers(source, added_date, id)',
+            'CREATE INDEX IF NOT EXISTS idx_papers_favorite_added ON papers(is_favorite, added_date, id)',
+            'CREATE INDEX IF NOT EXISTS idx_papers_read_added ON papers(read_status, added_date, id)',
+            'CREATE INDEX IF NOT EXISTS idx_papers_published ON papers(published_date)',
+            'CREATE INDEX IF NOT EXISTS idx_paper_tags_tag ON paper_tags(tag_id, paper_id)'
+        ):
+            cursor.execute(statement)
         
-        conn.commit()
-        conn.close()
+        # Per-query watermarks for incremental harvesting
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS watermarks (
+            query_key TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            query TEXT,
+            last_published TEXT,
+            last_updated TEXT,
+            seen_ids TEXT,
+            updated_at TEXT
+        )
+        ''')
+
+        # Durable batches of per-paper work (summaries, tags, downloads)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_batches (
+            id TEXT PRIMARY KEY,
+            label TEXT,
+            params TEXT,
+            papers TEXT NOT NULL,
+            status TEXT DEFAULT 'running',
+            created_at TEXT,
+            updated_at TEXT
+        )
+        ''')
+
+        # One row per (paper, stage) within a batch
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            batch_id TEXT NOT NULL,
+            paper_key TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            attempts INTEGER DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            updated_at TEXT,
+            UNIQUE(batch_id, paper_key, stage),
+            FOREIGN KEY(batch_id) REFERENCES job_batches(id)
+        )
+        ''')
+
+        # Manifest of downloaded PDFs, keyed by paper rather than by filename
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS downloads (
+            source TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER,
+            sha256 TEXT,
+            etag TEXT,
+            url TEXT,
+            fetched_at TEXT,
+            PRIMARY KEY(source, source_id)
+        )
+        ''')
+
+        # Per-page text extracted from downloaded PDFs (zlib-compressed JSON list)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fulltext (
+            source TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            pages BLOB,
+            page_count INTEGER,
+            chars INTEGER,
+            error TEXT,
+            extracted_at TEXT,
+            PRIMARY KEY(source, source_id)
+        )
+        ''')
+
+    # Normalized name tables: (table, link table, link column)
+    NAME_TABLES = (
+        ('authors', 'paper_authors', 'author_id'),
+        ('categories', 'paper_categories', 'category_id')
+    )
+
+    def _link_names(self, cursor, table: str, links: Dict[int, List[str]],
+                    existing: Optional[Iterable[int]] = None):
+        """
+        Replace the authors or categories (per `table`) of each paper in
+        `links`. `existing` names the papers that may already have links
+        (None: any of them); the rest are only inserted, not cleared first.
+        """
+        link_table, column = next((l, c) for t, l, c in self.NAME_TABLES if t == table)
+        rows = []
+        for paper_id, names in links.items():
+            if not names:
+                continue
+            if isinstance(names, str):
+                names = [names]
+            seen = set()
+            for name in names:
+                name = str(name).strip() if name else ''
+                if name and name not in seen:
+                    seen.add(name)
+                    rows.append((paper_id, name, len(seen) - 1))
+
+        stale = links if existing is None else set(existing).intersection(links)
+        cursor.executemany(f'DELETE FROM {link_table} WHERE paper_id = ?', [(paper_id,) for paper_id in stale])
+        if not rows:
+            return
+
+        all_names = list(dict.fromkeys(row[1] for row in rows))
+        cursor.executemany(f'INSERT OR IGNORE INTO {table} (name) VALUES (?)', [(name,) for name in all_names])
+        ids = {}
+        for start in range(0, len(all_names), self.KEY_CHUNK):
+            chunk = all_names[start:start + self.KEY_CHUNK]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'SELECT name, id FROM {table} WHERE name IN ({placeholders})', chunk)
+            ids.update(cursor.fetchall())
+
+        cursor.executemany(
+            f'INSERT INTO {link_table} (paper_id, {column}, position) VALUES (?, ?, ?)',
+            [(paper_id, ids[name], position) for paper_id, name, position in rows]
+        )
+
+    def _link_papers(self, cursor, papers: Dict[int, Dict[str, Any]], existing: Optional[Iterable[int]] = None):
+        """Sync the normalized authors and categories of freshly upserted papers (see _link_names)."""
+        existing = None if existing is None else set(existing)
+        self._link_names(cursor, 'authors', {pid: paper.get('authors') for pid, paper in papers.items()}, existing)
+        # Not every source reports categories; keep the stored ones when absent
+        self._link_names(cursor, 'categories', {
+            pid: paper['categories'] for pid, paper in papers.items() if 'categories' in paper
+        }, existing)
+
+    def _init_fts(self, cursor) -> bool:
+        """
+        Create the papers_fts index and the triggers that keep it in sync.
+
+        The index row for a paper shares its rowid with papers.id; all of the
+        paper's notes are concatenated into the notes column. Returns False
+        when this SQLite build lacks FTS5, in which case search() falls back
+        to LIKE matching.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='papers_fts'")
+        exists = cursor.fetchone() is not None
+
+        try:
+            cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                title, authors, summary, ai_summary, notes,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+            ''')
+        except sqlite3.OperationalError:
+            return False
+
+        # Every paper insert/update looks up that paper's notes; without this
+        # index each one scans the whole notes table
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_notes_paper ON notes(paper_id)')
+        notes_of = "(SELECT group_concat(content, ' ') FROM notes WHERE paper_id = {})"
+        cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+            INSERT INTO papers_fts(rowid, title, authors, summary, ai_summary, notes)
+            VALUES (new.id, new.title, new.authors, new.summary, new.ai_summary, {notes_of.format('new.id')});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS papers_fts_update
+        AFTER UPDATE OF title, authors, summary, ai_summary ON papers BEGIN
+            DELETE FROM papers_fts WHERE rowid = old.id;
+            INSERT INTO papers_fts(rowid, title, authors, summary, ai_summary, notes)
+            VALUES (new.id, new.title, new.authors, new.summary, new.ai_summary, {notes_of.format('new.id')});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+            DELETE FROM papers_fts WHERE rowid = old.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+            UPDATE papers_fts SET notes = {notes_of.format('new.paper_id')} WHERE rowid = new.paper_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+            UPDATE papers_fts SET notes = {notes_of.format('old.paper_id')} WHERE rowid = old.paper_id;
+            UPDATE papers_fts SET notes = {notes_of.format('new.paper_id')} WHERE rowid = new.paper_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+            UPDATE papers_fts SET notes = {notes_of.format('old.paper_id')} WHERE rowid = old.paper_id;
+        END;
+        ''')
+
+        if not exists:
+            # Backfill papers stored before the index existed
+            cursor.execute(f'''
+            INSERT INTO papers_fts(rowid, title, authors, summary, ai_summary, notes)
+            SELECT id, title, authors, summary, ai_summary, {notes_of.format('papers.id')} FROM papers
+            ''')
+        return True
+
+    UPSERT_PAPER_SQL = '''
+    INSERT INTO papers (source, source_id, title, authors, summary, pdf_url, published_date, added_date, ai_summary,
+                        doi, url, citations)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source, source_id) DO UPDATE SET
+    title=excluded.title,
+    authors=excluded.authors,
+    summary=excluded.summary,
+    pdf_url=excluded.pdf_url,
+    ai_summary=COALESCE(excluded.ai_summary, papers.ai_summary),
+    doi=COALESCE(excluded.doi, papers.doi),
+    url=COALESCE(excluded.url, papers.url),
+    citations=COALESCE(excluded.citations, papers.citations)
+    '''
+
+    @staticmethod
+    def _paper_key(paper_data: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        # Handle different ID keys
+        source_id = paper_data.get('arxiv_id') or paper_data.get('source_id') or paper_data.get('id')
+        return paper_data.get('source', 'arxiv'), str(source_id) if source_id else None
+
+    def _paper_row(self, paper_data: Dict[str, Any], added_date: str) -> Tuple:
+        source, source_id = self._paper_key(paper_data)
+        return (
+            source,
+            source_id,
+            paper_data.get('title'),
+            json.dumps(paper_data.get('authors', [])),
+            paper_data.get('summary'),
+            paper_data.get('pdf_url'),
+            paper_data.get('published'),
+            added_date,
+            paper_data.get('ai_summary'),
+            paper_data.get('doi'),
+            paper_data.get('url') or paper_data.get('link'),
+            paper_data.get('citations')
+        )
 
     def add_paper(self, paper_data: Dict[str, Any]) -> int:
         """Add a paper to the database. Returns paper ID."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        authors = json.dumps(paper_data.get('authors', []))
         added_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         try:
-            cursor.execute('''
-            INSERT INTO papers (source, source_id, title, authors, summary, pdf_url, published_date, added_date, ai_summary)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(source, source_id) DO UPDATE SET
-            title=excluded.title,
-            authors=excluded.authors,
-            summary=excluded.summary,
-            pdf_url=excluded.pdf_url,
-            ai_summary=COALESCE(excluded.ai_summary, papers.ai_summary)
-            ''', (
-                paper_data.get('source', 'arxiv'),
-                paper_data.get('arxiv_id') or paper_data.get('id'), # Handle different ID keys
-                paper_data.get('title'),
-                authors,
-                paper_data.get('summary'),
-                paper_data.get('pdf_url'),
-                paper_data.get('published'),
-                added_date,
-                paper_data.get('ai_summary')
-            ))
-            conn.commit()
-            
-            # Get the ID
-            cursor.execute('SELECT id FROM papers WHERE source=? AND source_id=?', 
-                          (paper_data.get('source', 'arxiv'), paper_data.get('arxiv_id') or paper_data.get('id')))
-            paper_id = cursor.fetchone()[0]
+            with self.transaction() as cursor:
+                cursor.execute(self.UPSERT_PAPER_SQL, self._paper_row(paper_data, added_date))
+                
+                # Get the ID
+                cursor.execute('SELECT id FROM papers WHERE source=? AND source_id=?', 
+                              self._paper_key(paper_data))
+                paper_id = cursor.fetchone()[0]
+                self._link_papers(cursor, {paper_id: paper_data})
             return paper_id
         except Exception as e:
             console.print(f"[red]Error adding paper: {e}[/red]")
             return -1
-        finally:
-            conn.close()
-
-    def get_paper(self, paper_id: int) -> Optional[Dict]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM papers WHERE id = ?', (paper_id,))
-        row = cursor.fetchone()
-        conn.close()
+
+    def add_papers(self, papers: Iterable[Dict[str, Any]]) -> "BulkResult":
+        """
+        Upsert many papers in one transaction.
+
+        Papers without an ID or title are counted as failed and skipped; the
+        rest go through a single executemany. IDs are looked up before and
+        after the write to tell inserts from updates, and are returned in
+        input order (None for failed papers).
+        """
+        papers = list(papers)
+        added_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        keys: List[Optional[Tuple[str, str]]] = []
+        rows = []
+        for paper in papers:
+            source, source_id = self._paper_key(paper)
+            if not source_id or not paper.get('title'):
+                keys.append(None)
+                continue
+            keys.append((source, source_id))
+            rows.append(self._paper_row(paper, added_date))
+
+        unique_keys = list(dict.fromkeys(key for key in keys if key))
+        try:
+            with self.transaction() as cursor:
+                existing = self._paper_ids(cursor, unique_keys)
+                cursor.executemany(self.UPSERT_PAPER_SQL, rows)
+                ids = self._paper_ids(cursor, unique_keys)
+                # Later duplicates of a paper win, as they do in the upsert
+                # Only papers that existed before this call can have stale links
+                self._link_papers(cursor, {ids[key]: paper for key, paper in zip(keys, papers) if key},
+                                  existing=existing.values())
+        except sqlite3.Error as e:
+            console.print(f"[red]Error adding papers: {e}[/red]")
+            return BulkResult(inserted=0, updated=0, failed=len(papers), ids=[None] * len(papers))
+
+        inserted = sum(1 for key in unique_keys if key not in existing)
+        return BulkResult(
+            inserted=inserted,
+            updated=len(unique_keys) - inserted,
+            failed=sum(1 for key in keys if key is None),
+            ids=[ids.get(key) if key else None for key in keys]
+        )
+
+    # Keeps IN (...) lists under SQLite's bound-parameter limit
+    KEY_CHUNK = 400
+
+    def _paper_ids(self, cursor, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """Map (source, source_id) keys to paper IDs, querying in chunks."""
+        by_source: Dict[str, List[str]] = {}
+        for source, source_id in keys:
+            by_source.setdefault(source, []).append(source_id)
+
+        ids = {}
+        for source, source_ids in by_source.items():
+            for start in range(0, len(source_ids), self.KEY_CHUNK):
+                chunk = source_ids[start:start + self.KEY_CHUNK]
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(
+                    f'SELECT source, source_id, id FROM papers WHERE source = ? AND source_id IN ({placeholders})',
+                    [source] + chunk
+                )
+                for row in cursor.fetchall():
+                    ids[(row[0], row[1])] = row[2]
+        return ids
+
+    def get_paper(self, paper_id: int) -> Optional[PaperRow]:
+        fields = list(self.PAPER_FIELDS)
+        with self._cursor() as cursor:
+            cursor.execute(f'SELECT {self._select_list(fields)} FROM papers p WHERE p.id = ?', (paper_id,))
+            row = cursor.fetchone()
         
         if row:
-            return self._row_to_dict(row)
+            return PaperRow(self._field_index(fields), row)
         return None
 
-    def get_all_papers(self, filter_favorite=False) -> List[Dict]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        query = 'SELECT * FROM papers'
-        if filter_favorite:
-            query += ' WHERE is_favorite = 1'
-        query += ' ORDER BY added_date DESC'
-            
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [self._row_to_dict(row) for row in rows]
+    def get_paper_by_doi(self, doi: str) -> Optional[PaperRow]:
+        papers, _ = self.query_papers({'doi': doi}, limit=1)
+        return papers[0] if papers else None
+
+    def get_paper_categories(self, paper_id: int) -> List[str]:
+        with self._cursor() as cursor:
+            cursor.execute('''
+            SELECT c.name FROM paper_categories pc JOIN categories c ON c.id = pc.category_id
+            WHERE pc.paper_id = ? ORDER BY pc.position
+            ''', (paper_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_all_papers(self, filter_favorite=False) -> List[PaperRow]:
+        # Materializes the whole library; prefer iter_papers() for full scans
+        return list(self.iter_papers({'favorite': True if filter_favorite else None}))
+
+    # Public field name -> papers column, for projections in query_papers()
+    PAPER_FIELDS = {
+        'id': 'id',
+        'source': 'source',
+        'source_id': 'source_id',
+        'title': 'title',
+        'authors': 'authors',
+        'summary': 'summary',
+        'pdf_url': 'pdf_url',
+        'published': 'published_date',
+        'added_date': 'added_date',
+        'is_favorite': 'is_favorite',
+        'read_status': 'read_status',
+        'ai_summary': 'ai_summary',
+        'doi': 'doi',
+        'url': 'url',
+        'citations': 'citations'
+    }
+
+    @classmethod
+    def _select_list(cls, fields: List[str]) -> str:
+        """
+        SELECT expressions (on alias p) for the given public fields. Long
+        text columns come back as raw UTF-8 bytes so that PaperRow only
+        decodes the ones a caller actually reads.
+        """
+        columns = []
+        for name in fields:
+            column = f"p.{cls.PAPER_FIELDS[name]}"
+            if name in ('summary', 'ai_summary'):
+                column = f"CAST({column} AS BLOB)"
+            columns.append(column)
+        return ', '.join(columns)
+
+    @staticmethod
+    def _field_index(fields: List[str]) -> Dict[str, int]:
+        return {name: position for position, name in enumerate(fields)}
+
+    @staticmethod
+    def _paper_filters(filters: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Any]]:
+        """
+        Build WHERE clauses (on alias p) for the supported paper filters:
+        source, since/until (published date bounds), favorite and read
+        (True/False, None for either), tag (tag name), and author, category
+        and doi (matched case-insensitively).
+        """
+        filters = filters or {}
+        where, params = [], []
+        if filters.get('favorite') is not None:
+            where.append('p.is_favorite = ?')
+            params.append(1 if filters['favorite'] else 0)
+        if filters.get('read') is not None:
+            where.append('p.read_status = ?')
+            params.append(1 if filters['read'] else 0)
+        if filters.get('source'):
+            where.append('p.source = ?')
+            params.append(filters['source'])
+        if filters.get('since'):
+            where.append('p.published_date >= ?')
+            params.append(filters['since'])
+        if filters.get('until'):
+            where.append('p.published_date <= ?')
+            params.append(filters['until'])
+        if filters.get('tag'):
+            # IN lets SQLite drive from the tag's papers instead of scanning all papers
+            where.append('''p.id IN (SELECT pt.paper_id FROM paper_tags pt JOIN tags t ON t.id = pt.tag_id
+                            WHERE t.name = ?)''')
+            params.append(filters['tag'])
+        if filters.get('author'):
+            where.append('''p.id IN (SELECT pa.paper_id FROM paper_authors pa JOIN authors a ON a.id = pa.author_id
+                            WHERE a.name = ? COLLATE NOCASE)''')
+            params.append(filters['author'])
+        if filters.get('category'):
+            where.append('''p.id IN (SELECT pc.paper_id FROM paper_categories pc JOIN categories c ON c.id = pc.category_id
+                            WHERE c.name = ? COLLATE NOCASE)''')
+            params.append(filters['category'])
+        if filters.get('doi'):
+            where.append('p.doi = ? COLLATE NOCASE')
+            params.append(filters['doi'])
+        return where, params
+
+    def query_papers(self, filters: Optional[Dict[str, Any]] = None, limit: int = 20,
+                     after: Optional[str] = None, fields: Optional[List[str]] = None) -> Tuple[List[PaperRow], Optional[str]]:
+        """
+        List papers newest first, one page at a time.
+
+        Pages are keyset-paginated on (added_date, id): pass the cursor
+        returned with one page as `after` to get the next, so every page
+        costs the same regardless of library size. `fields` limits the
+        columns read (see PAPER_FIELDS; id and added_date are always
+        included). Returns (papers, next_cursor); next_cursor is None on
+        the last page. Raises ValueError for a malformed cursor.
+        """
+        fields = [f for f in (fields or self.PAPER_FIELDS) if f in self.PAPER_FIELDS]
+        for required in ('added_date', 'id'):
+            if required not in fields:
+                fields.append(required)
+        columns = self._select_list(fields)
+
+        where, params = self._paper_filters(filters)
+        if after:
+            where.append('(p.added_date, p.id) < (?, ?)')
+            params.extend(self._parse_cursor(after))
+
+        sql = f'SELECT {columns} FROM papers p'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        # Fetch one extra row to know whether another page exists
+        sql += ' ORDER BY p.added_date DESC, p.id DESC LIMIT ?'
+
+        with self._cursor() as cursor:
+            cursor.execute(sql, params + [limit + 1])
+            rows = cursor.fetchall()
+
+        index = self._field_index(fields)
+        papers = [PaperRow(index, row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and papers:
+            last = papers[-1]
+            next_cursor = f"{last['added_date']}|{last['id']}"
+        return papers, next_cursor
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> Tuple[str, int]:
+        """Split an "added_date|id" page cursor, rejecting anything else."""
+        added_date, sep, paper_id = cursor.strip().rpartition('|')
+        if not sep or not added_date or not paper_id.isdigit():
+            raise ValueError(f"invalid page cursor {cursor!r}, expected '<added_date>|<id>'")
+        return added_date, int(paper_id)
+
+    def iter_papers(self, filters: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+                    batch_size: int = 500) -> Iterator[PaperRow]:
+        """
+        Stream every matching paper, newest first.
+
+        Rows are read in keyset-paginated batches of `batch_size`, so memory
+        stays flat however large the library is, and the connection lock is
+        released between batches rather than held while the caller works.
+        Takes the same filters and fields as query_papers().
+        """
+        after = None
+        while True:
+            papers, after = self.query_papers(filters, limit=batch_size, after=after, fields=fields)
+            yield from papers
+            if after is None:
+                return
+
+    # Column weights for bm25(): title, authors, summary, ai_summary, notes
+    SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 1.0, 2.0)
+
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None,
+               limit: int = 20, offset: int = 0) -> List[PaperRow]:
+        """
+        Full-text search over title, authors, summary, ai_summary and notes.
+
+        The query uses FTS5 syntax (AND/OR/NOT, "phrases", prefix*); input that
+        is not valid FTS5 is searched as plain terms instead. Supported filters:
+        see _paper_filters(). Hits are ordered by BM25 relevance and carry 'score' (lower is better)
+        and 'snippet' keys.
+        """
+        where, params = self._paper_filters(filters)
+        fields = list(self.PAPER_FIELDS)
+        columns = self._select_list(fields)
+
+        with self._cursor() as cursor:
+            if not self.fts_enabled:
+                like = f"%{query}%"
+                clauses = ' AND '.join(['(p.title LIKE ? OR p.summary LIKE ? OR p.ai_summary LIKE ?)'] + where)
+                cursor.execute(f'''
+                SELECT {columns}, 0, NULL FROM papers p WHERE {clauses}
+                ORDER BY p.added_date DESC LIMIT ? OFFSET ?
+                ''', [like, like, like] + params + [limit, offset])
+            else:
+                weights = ', '.join(str(w) for w in self.SEARCH_WEIGHTS)
+                clauses = ' AND '.join(['papers_fts MATCH ?'] + where)
+                sql = f'''
+                SELECT {columns}, bm25(papers_fts, {weights}) AS score,
+                       snippet(papers_fts, -1, '[', ']', '…', 12)
+                FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid
+                WHERE {clauses}
+                ORDER BY score LIMIT ? OFFSET ?
+                '''
+                try:
+                    cursor.execute(sql, [query] + params + [limit, offset])
+                except sqlite3.OperationalError:
+                    cursor.execute(sql, [self._fts_terms(query)] + params + [limit, offset])
+            rows = cursor.fetchall()
+
+        index = self._field_index(fields + ['score', 'snippet'])
+        return [PaperRow(index, row) for row in rows]
+
+    @staticmethod
+    def _fts_terms(query: str) -> str:
+        """Quote every whitespace-separated term so FTS5 operators are taken literally."""
+        terms = [term for term in query.split() if any(c.isalnum() for c in term)]
+        return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms) or '""'
 
     def toggle_favorite(self, paper_id: int) -> bool:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT is_favorite FROM papers WHERE id = ?', (paper_id,))
-        current = cursor.fetchone()
-        if not current:
-            return False
-            
-        new_status = 0 if current[0] else 1
-        cursor.execute('UPDATE papers SET is_favorite = ? WHERE id = ?', (new_status, paper_id))
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute('SELECT is_favorite FROM papers WHERE id = ?', (paper_id,))
+            current = cursor.fetchone()
+            if not current:
+                return False
+                
+            new_status = 0 if current[0] else 1
+            cursor.execute('UPDATE papers SET is_favorite = ? WHERE id = ?', (new_status, paper_id))
         return bool(new_status)
 
     def add_tag(self, name: str, color: str = 'blue') -> int:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('INSERT INTO tags (name, color) VALUES (?, ?)', (name, color))
-            conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
+        with self.transaction() as cursor:
+            cursor.execute('INSERT OR IGNORE INTO tags (name, color) VALUES (?, ?)', (name, color))
             cursor.execute('SELECT id FROM tags WHERE name = ?', (name,))
             return cursor.fetchone()[0]
-        finally:
-            conn.close()
 
     def tag_paper(self, paper_id: int, tag_name: str):
-        tag_id = self.add_tag(tag_name)
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('INSERT INTO paper_tags (paper_id, tag_id) VALUES (?, ?)', (paper_id, tag_id))
-            conn.commit()
-        except sqlite3.IntegrityError:
-            pass # Already tagged
-        finally:
-            conn.close()
+        # Tag creation and linking share one transaction on the shared connection
+        with self.transaction() as cursor:
+            tag_id = self.add_tag(tag_name)
+            cursor.execute('INSERT OR IGNORE INTO paper_tags (paper_id, tag_id) VALUES (?, ?)', (paper_id, tag_id))
 
     def add_note(self, paper_id: int, content: str):
-        conn = self._get_connection()
-        cursor = conn.cursor()
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute('INSERT INTO notes (paper_id, content, created_at, updated_at) VALUES (?, ?, ?, ?)',
-                      (paper_id, content, now, now))
-        conn.commit()
-        conn.close()
+        with self.transaction() as cursor:
+            cursor.execute('INSERT INTO notes (paper_id, content, created_at, updated_at) VALUES (?, ?, ?, ?)',
+                          (paper_id, content, now, now))
 
     def get_paper_notes(self, paper_id: int) -> List[Dict]:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM notes WHERE paper_id = ? ORDER BY created_at DESC', (paper_id,))
-        rows = cursor.fetchall()
-        conn.close()
+        with self._cursor() as cursor:
+            cursor.execute('SELECT * FROM notes WHERE paper_id = ? ORDER BY created_at DESC', (paper_id,))
+            rows = cursor.fetchall()
         
         return [{'id': r[0], 'content': r[2], 'created_at': r[3]} for r in rows]
 
-    def _row_to_dict(self, row) -> Dict:
-        # Helper to convert tuple to dict based on schema
-        # id, source, source_id, title, authors, summary, pdf_url, published_date, added_date, is_favorite, read_status, ai_summary
+    def fill_ai_summaries(self, papers: List[Dict]) -> int:
+        """
+        Copy stored AI summaries onto papers that do not have one yet,
+        so they can skip the LLM call. Returns the number of papers filled.
+        """
+        filled = 0
+        with self._cursor() as cursor:
+            for paper in papers:
+                if paper.get('ai_summary'):
+                    continue
+                source, source_id = self._paper_key(paper)
+                if not source_id:
+                    continue
+                cursor.execute(
+                    'SELECT ai_summary FROM papers WHERE source=? AND source_id=? AND ai_summary IS NOT NULL',
+                    (source, source_id)
+                )
+                row = cursor.fetchone()
+                if row and row[0]:
+                    paper['ai_summary'] = row[0]
+                    filled += 1
+        return filled
+
+    @staticmethod
+    def download_key(paper: Dict) -> Tuple[str, Optional[str]]:
+        """Return the (source, source_id) pair a paper's PDF is recorded under."""
+        source_id = paper.get('source_id') or paper.get('arxiv_id') or paper.get('id')
+        return paper.get('source') or 'arxiv', str(source_id) if source_id else None
+
+    def record_download(self, source: str, source_id: str, path: str, size: int,
+                        sha256: Optional[str] = None, etag: Optional[str] = None, url: Optional[str] = None):
+        """Insert or replace the manifest entry for a downloaded PDF."""
+        with self.transaction() as cursor:
+            cursor.execute('''
+            INSERT OR REPLACE INTO downloads (source, source_id, path, size, sha256, etag, url, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                source, source_id, path, size, sha256, etag, url,
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            ))
+
+    def get_download(self, source: str, source_id: str) -> Optional[Dict]:
+        """Return the manifest entry for a paper's PDF, or None if it was never downloaded."""
+        with self._cursor() as cursor:
+            cursor.execute('''
+            SELECT source, source_id, path, size, sha256, etag, url, fetched_at
+            FROM downloads WHERE source = ? AND source_id = ?
+            ''', (source, source_id))
+            row = cursor.fetchone()
+        return self._download_to_dict(row) if row else None
+
+    def remove_download(self, source: str, source_id: str):
+        """Forget a paper's PDF (the file itself is left alone)."""
+        with self.transaction() as cursor:
+            cursor.execute('DELETE FROM downloads WHERE source = ? AND source_id = ?', (source, source_id))
+
+    def get_downloads(self) -> List[Dict]:
+        """Return every manifest entry."""
+        with self._cursor() as cursor:
+            cursor.execute('''
+            SELECT source, source_id, path, size, sha256, etag, url, fetched_at
+            FROM downloads ORDER BY fetched_at
+            ''')
+            rows = cursor.fetchall()
+        return [self._download_to_dict(row) for row in rows]
+
+    def get_fulltext_hashes(self) -> Dict[Tuple[str, str], str]:
+        """Map (source, source_id) to the SHA-256 of the PDF its stored text came from."""
+        with self._cursor() as cursor:
+            cursor.execute('SELECT source, source_id, sha256 FROM fulltext')
+            return {(row[0], row[1]): row[2] for row in cursor.fetchall()}
+
+    def save_fulltexts(self, rows: List[Tuple]):
+        """
+        Store extracted text in one transaction.
+
+        Each row is (source, source_id, sha256, pages, page_count, chars, error),
+        where pages is the zlib-compressed JSON list of per-page strings.
+        """
+        extracted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction() as cursor:
+            cursor.executemany('''
+            INSERT OR REPLACE INTO fulltext
+            (source, source_id, sha256, pages, page_count, chars, error, extracted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [tuple(row) + (extracted_at,) for row in rows])
+
+    def get_fulltext(self, source: str, source_id: str) -> Optional[List[str]]:
+        """Return a paper's extracted text as a list of pages, or None if not extracted."""
+        with self._cursor() as cursor:
+            cursor.execute(
+                'SELECT pages FROM fulltext WHERE source = ? AND source_id = ? AND pages IS NOT NULL',
+                (source, source_id)
+            )
+            row = cursor.fetchone()
+        if not row:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def fill_pdf_paths(self, papers: List[Dict]) -> int:
+        """
+        Set pdf_path on papers whose PDF is in the download manifest and still
+        on disk. Returns the number of papers filled.
+        """
+        filled = 0
+        with self._cursor() as cursor:
+            for paper in papers:
+                source, source_id = self.download_key(paper)
+                if not source_id:
+                    continue
+                cursor.execute(
+                    'SELECT path FROM downloads WHERE source = ? AND source_id = ?',
+                    (source, source_id)
+                )
+                row = cursor.fetchone()
+                if row and Path(row[0]).exists():
+                    paper['pdf_path'] = row[0]
+                    filled += 1
+        return filled
+
+    @staticmethod
+    def make_query_key(source: str, keywords: str, **params) -> str:
+        """Build a stable watermark key from a source and its query parameters."""
+        normalized = ' '.join((keywords or '').lower().split())
+        extras = '&'.join(f"{k}={v}" for k, v in sorted(params.items()) if v is not None)
+        return f"{source}|{normalized}|{extras}"
+
+    def get_watermark(self, query_key: str) -> Optional[Dict]:
+        """Return the stored watermark for a query, or None on the first run."""
+        with self._cursor() as cursor:
+            cursor.execute('''
+            SELECT last_published, last_updated, seen_ids, updated_at FROM watermarks WHERE query_key = ?
+            ''', (query_key,))
+            row = cursor.fetchone()
+        
+        if not row:
+            return None
         return {
+            'last_published': row[0],
+            'last_updated': row[1],
+            'seen_ids': set(json.loads(row[2])) if row[2] else set(),
+            'updated_at': row[3]
+        }
+
+    def update_watermark(self, query_key: str, source: str, query: str, papers: List[Dict],
+                         truncated: bool = False) -> bool:
+        """
+        Advance a query's watermark past the given papers.
+
+        Keeps the newest published/updated timestamps seen so far, plus the IDs
+        sitting exactly on those timestamps so the next run can skip them.
+
+        Pass truncated=True when max_results cut the harvest short. An existing
+        watermark is then left alone, since moving it would strand the papers
+        between it and the ones fetched. The first run always creates one:
+        with no watermark there is no window to miss. Returns whether the
+        watermark was written.
+        """
+        current = self.get_watermark(query_key)
+        if current and truncated:
+            return False
+        current = current or {
+            'last_published': None, 'last_updated': None, 'seen_ids': set()
+        }
+        last_published = current['last_published']
+        last_updated = current['last_updated']
+        
+        for paper in papers:
+            if paper.get('published') and (not last_published or paper['published'] > last_published):
+                last_published = paper['published']
+            if paper.get('updated') and (not last_updated or paper['updated'] > last_updated):
+                last_updated = paper['updated']
+        
+        # Previously seen IDs only matter while one of the boundaries is unchanged
+        boundary_kept = ((last_published and last_published == current['last_published']) or
+                         (last_updated and last_updated == current['last_updated']))
+        seen_ids = set(current['seen_ids']) if boundary_kept else set()
+        for paper in papers:
+            paper_id = paper.get('arxiv_id') or paper.get('source_id') or paper.get('id')
+            if not paper_id:
+                continue
+            if (last_published and paper.get('published') == last_published) or \
+                    (last_updated and paper.get('updated') == last_updated):
+                seen_ids.add(paper_id)
+        
+        with self.transaction() as cursor:
+            cursor.execute('''
+            INSERT INTO watermarks (query_key, source, query, last_published, last_updated, seen_ids, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(query_key) DO UPDATE SET
+            last_published=excluded.last_published,
+            last_updated=excluded.last_updated,
+            seen_ids=excluded.seen_ids,
+            updated_at=excluded.updated_at
+            ''', (
+                query_key, source, query, last_published, last_updated,
+                json.dumps(sorted(seen_ids)), datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            ))
+        return True
+
+    def create_job_batch(self, batch_id: str, label: str, papers: List[Dict], params: Optional[Dict] = None):
+        """Persist a new job batch together with the papers it works on."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction() as cursor:
+            cursor.execute('''
+            INSERT INTO job_batches (id, label, params, papers, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, 'running', ?, ?)
+            ''', (batch_id, label, json.dumps(params or {}, ensure_ascii=False),
+                  json.dumps(papers, ensure_ascii=False, default=str), now, now))
+
+    def get_job_batch(self, batch_id: str) -> Optional[Dict]:
+        with self._cursor() as cursor:
+            cursor.execute('''
+            SELECT id, label, params, papers, status, created_at, updated_at FROM job_batches WHERE id = ?
+            ''', (batch_id,))
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+        return self._job_batch_to_dict(row, with_papers=True)
+
+    def get_unfinished_job_batches(self) -> List[Dict]:
+        """Return batches that were not finished, newest first, with per-stage job counts."""
+        with self._cursor() as cursor:
+            cursor.execute('''
+            SELECT id, label, params, papers, status, created_at, updated_at FROM job_batches
+            WHERE status = 'running' ORDER BY created_at DESC
+            ''')
+            batches = [self._job_batch_to_dict(row) for row in cursor.fetchall()]
+
+            for batch in batches:
+                cursor.execute('''
+                SELECT stage, status, COUNT(*) FROM jobs WHERE batch_id = ? GROUP BY stage, status
+                ''', (batch['id'],))
+                counts = {}
+                for stage, status, count in cursor.fetchall():
+                    counts.setdefault(stage, {})[status] = count
+                batch['counts'] = counts
+
+        return batches
+
+    def update_job_batch(self, batch_id: str, params: Optional[Dict] = None, status: Optional[str] = None):
+        """Merge new params into a batch and/or change its status."""
+        with self.transaction() as cursor:
+            cursor.execute('SELECT params, status FROM job_batches WHERE id = ?', (batch_id,))
+            row = cursor.fetchone()
+            if not row:
+                return
+
+            merged = json.loads(row[0]) if row[0] else {}
+            merged.update(params or {})
+            cursor.execute('''
+            UPDATE job_batches SET params = ?, status = ?, updated_at = ? WHERE id = ?
+            ''', (json.dumps(merged, ensure_ascii=False), status or row[1],
+                  datetime.now().strftime("%Y-%m-%d %H:%M:%S"), batch_id))
+
+    def add_jobs(self, batch_id: str, stage: str, paper_keys: List[str]):
+        """Enqueue a stage for the given papers; existing jobs are left untouched."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.transaction() as cursor:
+            cursor.executemany('''
+            INSERT OR IGNORE INTO jobs (batch_id, paper_key, stage, status, attempts, updated_at)
+            VALUES (?, ?, ?, 'pending', 0, ?)
+            ''', [(batch_id, key, stage, now) for key in paper_keys])
+
+    def get_jobs(self, batch_id: str, stage: Optional[str] = None) -> List[Dict]:
+        query = '''
+        SELECT paper_key, stage, status, attempts, result, error, updated_at FROM jobs WHERE batch_id = ?
+        '''
+        params = [batch_id]
+        if stage:
+            query += ' AND stage = ?'
+            params.append(stage)
+        with self._cursor() as cursor:
+            cursor.execute(query + ' ORDER BY id', params)
+            rows = cursor.fetchall()
+
+        return [{
+            'paper_key': r[0],
+            'stage': r[1],
+            'status': r[2],
+            'attempts': r[3],
+            'result': json.loads(r[4]) if r[4] else None,
+            'error': r[5],
+            'updated_at': r[6]
+        } for r in rows]
+
+    def finish_job(self, batch_id: str, paper_key: str, stage: str, status: str,
+                   result: Any = None, error: Optional[str] = None):
+        """Record the outcome of one attempt at a job."""
+        self.finish_jobs([(batch_id, paper_key, stage, status, result, error)])
+
+    def finish_jobs(self, outcomes: Iterable[Tuple]):
+        """
+        Record many job outcomes in one transaction; each outcome is
+        (batch_id, paper_key, stage, status, result, error).
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [(
+            status,
+            json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+            error,
+            now,
+            batch_id, paper_key, stage
+        ) for batch_id, paper_key, stage, status, result, error in outcomes]
+
+        with self.transaction() as cursor:
+            cursor.executemany('''
+            UPDATE jobs SET status = ?, attempts = attempts + 1, result = ?, error = ?, updated_at = ?
+            WHERE batch_id = ? AND paper_key = ? AND stage = ?
+            ''', rows)
+
+    def _job_batch_to_dict(self, row, with_papers: bool = False) -> Dict:
+        # id, label, params, papers, status, created_at, updated_at
+        batch = {
             'id': row[0],
-            'source': row[1],
-            'source_id': row[2],
-            'title': row[3],
-            'authors': json.loads(row[4]) if row[4] else [],
-            'summary': row[5],
-            'pdf_url': row[6],
-            'published': row[7],
-            'added_date': row[8],
-            'is_favorite': bool(row[9]),
-            'read_status': bool(row[10]),
-            'ai_summary': row[11]
+            'label': row[1],
+            'params': json.loads(row[2]) if row[2] else {},
+            'status': row[4],
+            'created_at': row[5],
+            'updated_at': row[6]
+        }
+        if with_papers:
+            batch['papers'] = json.loads(row[3]) if row[3] else []
+        return batch
+
+    def _download_to_dict(self, row) -> Dict:
+        # source, source_id, path, size, sha256, etag, url, fetched_at
+        return {
+            'source': row[0],
+            'source_id': row[1],
+            'path': row[2],
+            'size': row[3],
+            'sha256': row[4],
+            'etag': row[5],
+            'url': row[6],
+            'fetched_at': row[7]
         }
@@ -1,6 +1,7 @@
 """
 引用导出模块 - 支持多种引用格式
 """
+import os
 from typing import List, Dict
 from datetime import datetime
 
@@ -71,6 +72,11 @@ class CitationExporter:
             if url:
                 entry += f"\n  url = {{{url}}},"
             
+            # 本地 PDF（JabRef/Zotero 的 file 字段格式）
+            pdf_path = paper.get('pdf_path')
+            if pdf_path:
+                entry += f"\n  file = {{:{os.path.abspath(pdf_path)}:PDF}},"
+            
             entry += "\n}"
             
             bibtex_entries.append(entry)
@@ -226,18 +232,18 @@ class CitationExporter:
         return citation
     
     @staticmethod
-    def export_all_formats(papers: List[Dict], output_dir: str = "papers/citations"):
+    def export_all_formats(papers: List[Dict], output_dir: str = "papers/citations", manifest=None):
         """
         导出所有格式
         
         Args:
             papers: 论文列表 (Paper对象或字典)
             output_dir: 输出目录
+            manifest: 记录下载清单的数据库，提供时为已下载的论文填写 BibTeX file 字段
             
         Returns:
             保存的文件路径列表
         """
-        import os
         os.makedirs(output_dir, exist_ok=True)
         
         # 确保所有论文都是字典格式
@@ -254,6 +260,8 @@ class CitationExporter:
                     continue
         
         papers = paper_dicts
+        if manifest is not None:
+            manifest.fill_pdf_paths(papers)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         saved_files = []
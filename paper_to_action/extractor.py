@@ -0,0 +1,179 @@
+"""
+全文提取模块 - 在进程池中把已下载的 PDF 转为逐页纯文本
+
+待处理的文件来自下载清单，提取结果按页压缩后存入数据库的 fulltext 表。每条结果记录
+来源 PDF 的 SHA-256，内容未变的文件再次运行时直接跳过；文件大小与清单不符时重新计算
+摘要，不直接信任清单。需要可选依赖 pypdf：
+
+    pip install "paper-seek-max[pdf]"
+"""
+import json
+import logging
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from rich.console import Console
+from .blob_store import BlobStore
+from .database import Database
+
+try:
+    from pypdf import PdfReader
+    # 损坏文件的警告会打乱进度条，错误已记录在结果中
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+except ImportError:
+    PdfReader = None
+
+console = Console()
+
+
+@dataclass
+class ExtractStats:
+    """批量提取统计"""
+    total: int
+    extracted: int
+    skipped: int
+    failed: int
+    missing: int = 0
+
+
+def _extract_worker(task: Tuple[str, str, str, str]) -> Tuple:
+    """
+    在子进程中提取一个 PDF 的逐页文本并压缩
+
+    Args:
+        task: (source, source_id, PDF 路径, SHA-256)
+
+    Returns:
+        (source, source_id, sha256, 压缩后的页面, 页数, 字符数, 错误信息)
+    """
+    source, source_id, path, sha256 = task
+    try:
+        reader = PdfReader(path)
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        return source, source_id, sha256, None, 0, 0, f"{type(e).__name__}: {e}"
+
+    # 在子进程中压缩，主进程只负责写库
+    data = zlib.compress(json.dumps(pages, ensure_ascii=False).encode('utf-8'))
+    return source, source_id, sha256, data, len(pages), sum(len(page) for page in pages), None
+
+
+class TextExtractor:
+    """PDF 全文提取器"""
+
+    def __init__(self, db: Database, max_workers: Optional[int] = None, batch_size: int = 50):
+        """
+        初始化提取器
+
+        Args:
+            db: 数据库实例（提供下载清单并保存提取结果）
+            max_workers: 进程数，None 或 0 表示使用全部 CPU 核心
+            batch_size: 每次写库的结果条数
+        """
+        self.db = db
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+
+    @staticmethod
+    def available() -> bool:
+        """是否已安装 pypdf"""
+        return PdfReader is not None
+
+    def pending(self, force: bool = False) -> List[Tuple[str, str, str, str]]:
+        """
+        找出需要提取的 PDF：文件仍在，且从未提取或内容已变
+
+        Args:
+            force: 忽略已有结果，全部重新提取
+
+        Returns:
+            (source, source_id, 路径, SHA-256) 列表
+        """
+        return self._scan(force)[0]
+
+    def _scan(self, force: bool) -> Tuple[List[Tuple[str, str, str, str]], int]:
+        """返回 (待提取任务, 清单中文件已不存在的条数)"""
+        done = {} if force else self.db.get_fulltext_hashes()
+        tasks = []
+        missing = 0
+        for entry in self.db.get_downloads():
+            path = entry['path']
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                missing += 1
+                continue
+
+            sha256 = entry['sha256']
+            # 文件在下载后被替换或改动过，清单中的摘要已不可信，重新计算
+            if not sha256 or (entry['size'] is not None and size != entry['size']):
+                try:
+                    sha256 = BlobStore.digest_file(path)
+                except OSError:
+                    missing += 1
+                    continue
+
+            if done.get((entry['source'], entry['source_id'])) == sha256:
+                continue
+            tasks.append((entry['source'], entry['source_id'], path, sha256))
+        return tasks, missing
+
+    def extract_all(self, force: bool = False, progress_callback=None) -> ExtractStats:
+        """
+        提取下载清单中全部待处理的 PDF
+
+        Args:
+            force: 忽略已有结果，全部重新提取
+            progress_callback: 进度回调函数，接收 (current, total) 参数
+
+        Returns:
+            提取统计
+        """
+        total = len(self.db.get_downloads())
+        if not self.available():
+            console.print('[red]✗ 未安装 pypdf，请运行 pip install "paper-seek-max[pdf]"[/red]')
+            return ExtractStats(total=total, extracted=0, skipped=0, failed=0)
+
+        tasks, missing = self._scan(force)
+        extracted = 0
+        failed = 0
+        buffer: List[Tuple] = []
+
+        if tasks:
+            workers = min(self.max_workers, len(tasks))
+            # 每个子进程一次领取多份任务，减少进程间通信
+            chunksize = max(1, len(tasks) // (workers * 4))
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for completed, row in enumerate(executor.map(_extract_worker, tasks, chunksize=chunksize), 1):
+                        buffer.append(row)
+                        if row[-1] is None:
+                            extracted += 1
+                        else:
+                            failed += 1
+
+                        if len(buffer) >= self.batch_size:
+                            self.db.save_fulltexts(buffer)
+                            buffer = []
+
+                        if progress_callback:
+                            progress_callback(completed, len(tasks))
+            except BrokenProcessPool:
+                # 子进程异常退出（如内存不足被杀），先保存已完成的结果，下次运行时跳过它们
+                if buffer:
+                    self.db.save_fulltexts(buffer)
+                raise
+
+        if buffer:
+            self.db.save_fulltexts(buffer)
+
+        return ExtractStats(
+            total=total,
+            extracted=extracted,
+            skipped=total - len(tasks) - missing,
+            failed=failed,
+            missing=missing
+        )
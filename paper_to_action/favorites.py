@@ -3,10 +3,11 @@
 """
 import os
 import json
-import shutil
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 from rich.console import Console
+from .blob_store import BlobStore, get_blob_store
+from .database import Database
 
 console = Console()
 
@@ -14,14 +15,23 @@ console = Console()
 class FavoriteManager:
     """论文收藏管理器"""
     
-    def __init__(self, output_dir: str = "papers"):
+    def __init__(
+        self,
+        output_dir: str = "papers",
+        blob_store: Optional[BlobStore] = None,
+        manifest: Optional[Database] = None
+    ):
         """
         初始化收藏管理器
         
         Args:
             output_dir: 输出目录
+            blob_store: PDF 内容存储，None 表示使用全局存储
+            manifest: 记录下载清单的数据库，用于查找论文的 PDF
         """
         self.output_dir = Path(output_dir)
+        self.blob_store = blob_store or get_blob_store()
+        self.manifest = manifest
         self.favorites_dir = self.output_dir / "favorites"
         self.metadata_file = self.favorites_dir / "metadata.json"
         
@@ -84,11 +94,15 @@ class FavoriteManager:
         
         favorites.append(favorite_entry)
         
-        # 复制论文PDF（如果有）
-        if 'pdf_path' in paper and os.path.exists(paper['pdf_path']):
-            pdf_filename = os.path.basename(paper['pdf_path'])
-            dest_path = self.favorites_dir / pdf_filename
-            shutil.copy2(paper['pdf_path'], dest_path)
+        # 链接论文PDF（如果有），与下载目录共用同一存储对象，不再复制一份
+        download = self._find_download(paper)
+        if download:
+            dest_path = self.favorites_dir / os.path.basename(download['path'])
+            self.blob_store.link(download['sha256'], str(dest_path))
+            favorite_entry['pdf_path'] = str(dest_path)
+        elif 'pdf_path' in paper and os.path.exists(paper['pdf_path']):
+            dest_path = self.favorites_dir / os.path.basename(paper['pdf_path'])
+            self.blob_store.add_view(paper['pdf_path'], str(dest_path))
             favorite_entry['pdf_path'] = str(dest_path)
         
         # 保存完整论文信息
@@ -105,6 +119,18 @@ class FavoriteManager:
         console.print(f"[green]✓ 已添加到收藏夹: {paper.get('title', '')[:50]}...[/green]")
         return True
     
+    def _find_download(self, paper: Dict) -> Optional[Dict]:
+        """在下载清单中查找内容仍在存储中的 PDF"""
+        if self.manifest is None:
+            return None
+        source, source_id = Database.download_key(paper)
+        if not source_id:
+            return None
+        download = self.manifest.get_download(source, source_id)
+        if download and download['sha256'] and self.blob_store.blob_path(download['sha256']).exists():
+            return download
+        return None
+    
     def remove_favorite(self, paper_id: str) -> bool:
         """
         从收藏夹移除论文
@@ -125,7 +151,7 @@ class FavoriteManager:
                 if 'data_file' in fav and os.path.exists(fav['data_file']):
                     os.remove(fav['data_file'])
                 if 'pdf_path' in fav and os.path.exists(fav['pdf_path']):
-                    os.remove(fav['pdf_path'])
+                    self.blob_store.release(fav['pdf_path'])
                 
                 favorites.pop(i)
                 metadata['favorites'] = favorites
@@ -0,0 +1,138 @@
+"""
+HTTP 客户端模块 - 所有数据源与 PDF 下载共享的连接池会话
+"""
+import threading
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .rate_limit import get_rate_limiter, parse_retry_after
+
+# 传输层自动重试的状态码（503 会遵循 Retry-After 头）
+# 429 不在此列：交给 RateLimitedSession 处理，以便暂停同一主机上的所有请求
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class RateLimitedSession(requests.Session):
+    """每次请求前向共享限流器申请令牌，并在 429 时暂停该主机后重试"""
+    
+    def __init__(self, max_throttle_retries: int = 3):
+        super().__init__()
+        self.max_throttle_retries = max_throttle_retries
+    
+    def request(self, method, url, *args, **kwargs):
+        limiter = get_rate_limiter()
+        host = limiter.host_of(url)
+        
+        for attempt in range(self.max_throttle_retries + 1):
+            limiter.acquire(host)
+            response = super().request(method, url, *args, **kwargs)
+            
+            if response.status_code != 429 or attempt == self.max_throttle_retries:
+                return response
+            
+            limiter.on_throttled(host, parse_retry_after(response.headers.get('Retry-After')))
+            response.close()
+        
+        return response
+
+
+def create_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 1.0
+) -> requests.Session:
+    """
+    创建带连接池、keep-alive、传输层重试和主机限流的会话
+
+    Args:
+        pool_connections: 缓存的主机连接池数量
+        pool_maxsize: 每个主机连接池的最大连接数
+        max_retries: 连接失败或 5xx 时传输层的最大重试次数；429 不在传输层重试，
+            由 RateLimitedSession 暂停该主机后重试，上限同为此值
+        backoff_factor: 指数退避系数（秒）
+
+    Returns:
+        配置好的 requests.Session
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"HEAD", "GET", "OPTIONS"}),
+        respect_retry_after_header=True,
+        # 重试耗尽后返回最后一次响应，由调用方按状态码处理
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = RateLimitedSession(max_throttle_retries=max_retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _session_from_config(config) -> requests.Session:
+    """按 Config 中的 http_* 配置项创建会话"""
+    return create_session(
+        pool_connections=int(config.get("http_pool_connections", 10)),
+        pool_maxsize=int(config.get("http_pool_maxsize", 10)),
+        max_retries=int(config.get("http_max_retries", 3)),
+        backoff_factor=float(config.get("http_backoff_factor", 1.0))
+    )
+
+
+def configure_http(config=None) -> requests.Session:
+    """
+    根据配置重建全局共享会话
+
+    Args:
+        config: Config 实例，None 表示加载默认配置
+
+    Returns:
+        新的全局会话
+    """
+    global _session
+
+    if config is None:
+        from .config import Config
+        config = Config()
+
+    session = _session_from_config(config)
+
+    with _session_lock:
+        old_session, _session = _session, session
+
+    if old_session is not None:
+        old_session.close()
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    获取全局共享会话（首次调用时按默认配置创建）
+
+    Returns:
+        requests.Session
+    """
+    global _session
+
+    if _session is None:
+        from .config import Config
+        config = Config()
+        with _session_lock:
+            if _session is None:
+                _session = _session_from_config(config)
+    return _session
@@ -0,0 +1,299 @@
+"""
+任务队列模块 - 基于 SQLite 的可恢复批处理任务
+
+每批论文的每个阶段（摘要、标签、下载）按 (论文, 阶段) 记录一行任务及其状态、
+尝试次数和结果。中途崩溃或中断后，可通过 `paper-seek resume` 只处理剩余的任务。
+"""
+import uuid
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, List, Optional
+from rich.console import Console
+from .database import Database
+from .llm_client import LLMClient, SUMMARY_FAILURE_PREFIX
+from .pdf_downloader import PDFDownloader
+from .persistence import PersistenceWriter
+
+console = Console()
+
+# 阶段名称，按执行顺序排列
+STAGE_SUMMARY = "summary"
+STAGE_ANALYSIS = "analysis"
+STAGE_TAGS = "tags"
+STAGE_DOWNLOAD = "download"
+STAGE_ORDER = [STAGE_SUMMARY, STAGE_ANALYSIS, STAGE_TAGS, STAGE_DOWNLOAD]
+
+
+def _summary_ok(summary: Any) -> bool:
+    return isinstance(summary, str) and bool(summary) and not summary.startswith(SUMMARY_FAILURE_PREFIX)
+
+
+class JobQueue:
+    """一批论文的持久化任务队列"""
+
+    def __init__(
+        self,
+        db: Database,
+        batch_id: str,
+        papers: List[Dict],
+        params: Optional[Dict] = None,
+        max_attempts: int = 3,
+        writer: Optional[PersistenceWriter] = None
+    ):
+        """
+        初始化任务队列（通常通过 create() 或 load() 获得）
+
+        Args:
+            db: 数据库实例
+            batch_id: 批次 ID
+            papers: 本批论文
+            params: 批次参数（语言、输出目录等），恢复时使用
+            max_attempts: 单个任务的最大尝试次数，超出后不再自动重试
+            writer: 后台写入线程，提供时任务结果由它批量写入
+        """
+        self.db = db
+        self.batch_id = batch_id
+        self.papers = papers
+        self.params = params or {}
+        self.max_attempts = max_attempts
+        self.writer = writer
+
+    @classmethod
+    def create(cls, db: Database, label: str, papers: List[Dict], params: Optional[Dict] = None,
+               writer: Optional[PersistenceWriter] = None) -> "JobQueue":
+        """
+        新建一个批次并保存论文列表
+
+        Args:
+            db: 数据库实例
+            label: 批次说明（如搜索关键词）
+            papers: 本批论文
+            params: 批次参数
+            writer: 后台写入线程，提供时任务结果由它批量写入
+
+        Returns:
+            JobQueue
+        """
+        batch_id = uuid.uuid4().hex[:12]
+        db.create_job_batch(batch_id, label, papers, params)
+        return cls(db, batch_id, papers, params, writer=writer)
+
+    @classmethod
+    def load(cls, db: Database, batch_id: str) -> Optional["JobQueue"]:
+        """
+        加载已有批次，并把已完成任务的结果写回论文
+
+        Args:
+            db: 数据库实例
+            batch_id: 批次 ID
+
+        Returns:
+            JobQueue，批次不存在时返回 None
+        """
+        batch = db.get_job_batch(batch_id)
+        if not batch:
+            return None
+        queue = cls(db, batch_id, batch['papers'], batch['params'])
+        queue.apply()
+        return queue
+
+    @staticmethod
+    def paper_key(paper: Dict) -> str:
+        """论文在批次内的唯一键"""
+        paper_id = paper.get('source_id') or paper.get('arxiv_id') or paper.get('id') or paper.get('title', '')
+        return f"{paper.get('source', 'arxiv')}:{paper_id}"
+
+    @staticmethod
+    def make_params(language: str, output_format: str = "markdown", save_db: bool = True,
+                    max_tags: int = 5) -> Dict:
+        """
+        生成批次参数，CLI 与交互式界面创建批次时共用，保证 resume 的行为一致
+
+        Args:
+            language: 摘要语言
+            output_format: 结果文件格式 (json/markdown/both)
+            save_db: 恢复完成后是否把结果写入数据库
+            max_tags: 每篇论文的最大标签数
+
+        Returns:
+            批次参数字典
+        """
+        return {
+            'language': language,
+            'output_format': output_format,
+            'save_db': save_db,
+            'max_tags': max_tags
+        }
+
+    def set_params(self, **params):
+        """更新批次参数（如用户中途选择的下载目录）"""
+        self.params.update(params)
+        self.db.update_job_batch(self.batch_id, params=params)
+
+    def enqueue(self, stage: str, papers: Optional[List[Dict]] = None):
+        """
+        为论文登记一个阶段的任务，已登记的任务保持原状态
+
+        Args:
+            stage: 阶段名称
+            papers: 论文列表，None 表示本批全部论文
+        """
+        papers = self.papers if papers is None else papers
+        self.db.add_jobs(self.batch_id, stage, [self.paper_key(p) for p in papers])
+
+    def stages(self) -> List[str]:
+        """本批已登记的阶段，按执行顺序排列"""
+        present = {job['stage'] for job in self.db.get_jobs(self.batch_id)}
+        return [stage for stage in STAGE_ORDER if stage in present]
+
+    def pending(self, stage: str) -> List[Dict]:
+        """
+        获取某阶段尚未完成且仍可重试的论文
+
+        Args:
+            stage: 阶段名称
+
+        Returns:
+            论文列表
+        """
+        unfinished = {
+            job['paper_key'] for job in self.db.get_jobs(self.batch_id, stage)
+            if job['status'] != 'done' and job['attempts'] < self.max_attempts
+        }
+        return [p for p in self.papers if self.paper_key(p) in unfinished]
+
+    def remaining(self) -> int:
+        """所有阶段中尚未完成且仍可重试的任务数"""
+        return sum(
+            1 for job in self.db.get_jobs(self.batch_id)
+            if job['status'] != 'done' and job['attempts'] < self.max_attempts
+        )
+
+    def callback(self, stage: str) -> Callable[[Dict, Any], None]:
+        """
+        生成逐条记录结果的回调，传给批处理方法的 item_callback
+
+        Args:
+            stage: 阶段名称
+
+        Returns:
+            接收 (paper, result) 的回调函数
+        """
+        def record(paper: Dict, result: Any):
+            if is_dataclass(result):
+                result = asdict(result)
+
+            if stage == STAGE_SUMMARY:
+                ok = _summary_ok(result)
+                error = None if ok else result
+            elif stage == STAGE_ANALYSIS:
+                ok = bool(result) and _summary_ok(result.get('summary')) and bool(result.get('tags'))
+                error = None if ok else (result or {}).get('summary')
+            elif stage == STAGE_TAGS:
+                ok = bool(result)
+                error = None if ok else "未生成标签"
+            else:
+                ok = bool(result and result.get('success'))
+                error = None if ok else (result or {}).get('error')
+
+            # 在 LLM / 下载工作线程中调用，交给后台线程时不等待写库
+            (self.writer or self.db).finish_job(
+                self.batch_id, self.paper_key(paper), stage,
+                'done' if ok else 'failed', result=result, error=error
+            )
+
+        return record
+
+    def apply(self, papers: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        把已完成任务的结果写回论文字典
+
+        Args:
+            papers: 论文列表，None 表示本批全部论文
+
+        Returns:
+            论文列表
+        """
+        papers = self.papers if papers is None else papers
+        by_key = {self.paper_key(p): p for p in papers}
+
+        for job in self.db.get_jobs(self.batch_id):
+            paper = by_key.get(job['paper_key'])
+            result = job['result']
+            if paper is None or job['status'] != 'done' or result is None:
+                continue
+
+            if job['stage'] == STAGE_SUMMARY:
+                paper['ai_summary'] = result
+            elif job['stage'] == STAGE_ANALYSIS:
+                paper['ai_summary'] = result.get('summary')
+                paper['tags'] = result.get('tags', [])
+                if result.get('key_methods'):
+                    paper['key_methods'] = result['key_methods']
+            elif job['stage'] == STAGE_TAGS:
+                paper['tags'] = result
+            elif job['stage'] == STAGE_DOWNLOAD:
+                paper['pdf_path'] = result.get('file_path')
+
+        return papers
+
+    def resume(self, config) -> List[Dict]:
+        """
+        依次执行各阶段尚未完成的任务
+
+        Args:
+            config: Config 实例，提供 API 与并发配置
+
+        Returns:
+            合并了全部结果的论文列表
+        """
+        llm_client = None
+
+        for stage in self.stages():
+            papers = self.pending(stage)
+            if not papers:
+                continue
+            console.print(f"[cyan]⏯  继续阶段 {stage}：剩余 {len(papers)} 篇论文[/cyan]")
+
+            if stage == STAGE_DOWNLOAD:
+                pdf_dir = self.params.get('pdf_dir') or str(config.get_output_dir() / "pdfs")
+                downloader = PDFDownloader(
+                    output_dir=pdf_dir,
+                    max_workers=int(config.get("pdf_max_workers", 4)),
+                    per_host_limit=int(config.get("pdf_per_host_limit", 2)),
+                    max_bandwidth=float(config.get("pdf_max_bandwidth_kb", 0)) * 1024 or None,
+                    manifest=self.db
+                )
+                stats = downloader.batch_download(papers, item_callback=self.callback(stage))
+                downloader.print_download_report(stats)
+                continue
+
+            if llm_client is None:
+                if not config.is_configured():
+                    console.print(f"[red]⚠ 阶段 {stage} 需要先配置 API，已跳过[/red]")
+                    continue
+                llm_client = LLMClient(
+                    api_key=config.get("api_key"),
+                    base_url=config.get("base_url"),
+                    model=config.get("model"),
+                    max_concurrency=int(config.get("llm_max_concurrency", 8)),
+                    pack_token_budget=int(config.get("llm_pack_token_budget", 4000))
+                )
+
+            language = self.params.get('language', config.get("language", "zh"))
+            max_tags = self.params.get('max_tags', 5)
+            if stage == STAGE_SUMMARY:
+                llm_client.batch_summarize(papers, language=language, item_callback=self.callback(stage))
+            elif stage == STAGE_ANALYSIS:
+                llm_client.batch_analyze(papers, language=language, max_tags=max_tags,
+                                         item_callback=self.callback(stage))
+            elif stage == STAGE_TAGS:
+                llm_client.batch_generate_tags(papers, max_tags=max_tags, item_callback=self.callback(stage))
+
+        return self.apply()
+
+    def finish(self):
+        """标记批次已完成，不再出现在 resume 列表中"""
+        if self.writer:
+            # 先写完排队中的任务结果
+            self.writer.flush()
+        self.db.update_job_batch(self.batch_id, status='done')
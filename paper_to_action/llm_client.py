@@ -1,18 +1,40 @@
 """
 LLM 客户端模块 - 用于生成论文摘要和标签
 """
+import asyncio
+import json
 import openai
-from typing import Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List
 from rich.console import Console
-import time
+from .cache import ResponseCache, get_llm_cache
+from .llm_engine import AsyncLLMEngine
+from .rate_limit import get_rate_limiter, parse_retry_after
 
 console = Console()
 
+# 摘要生成失败时返回文本的前缀，这类结果不写入缓存
+SUMMARY_FAILURE_PREFIX = "摘要生成失败"
+
 
 class LLMClient:
     """LLM 客户端类，用于调用 LLM API 生成论文摘要"""
     
-    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1", model: str = "gpt-4o-mini"):
+    # 修改提示词模板时递增，使旧的缓存结果失效
+    PROMPT_VERSION = 1
+    
+    # 打包标签请求的固定提示词开销与每个标签的预计输出 token
+    PACK_PROMPT_TOKENS = 200
+    PACK_TOKENS_PER_TAG = 6
+    
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.openai.com/v1",
+        model: str = "gpt-4o-mini",
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None,
+        pack_token_budget: int = 4000
+    ):
         """
         初始化 LLM 客户端
         
@@ -20,23 +42,49 @@ class LLMClient:
             api_key: API 密钥
             base_url: API 基础 URL
             model: 使用的模型名称
+            max_concurrency: 批量生成时的最大并发请求数
+            cache: LLM 结果缓存，None 表示使用全局缓存（get_llm_cache）
+            pack_token_budget: 打包标签请求的 token 预算（输入 + 输出），0 表示不打包
         """
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
+        self.max_concurrency = max_concurrency
+        self.pack_token_budget = pack_token_budget
         self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
+        self.engine = AsyncLLMEngine(api_key, base_url, max_concurrency=max_concurrency)
+        self.host = get_rate_limiter().host_of(base_url)
+        self.cache = cache if cache is not None else get_llm_cache()
+        # 接口不支持 JSON 模式时置为 False，合并分析改为分别生成
+        self.json_mode = True
     
-    def summarize_paper(self, paper: Dict, language: str = "zh") -> str:
+    def _chat(self, max_retries: int = 3, **kwargs):
         """
-        生成论文摘要
+        调用 chat.completions 接口，请求节奏由共享限流器控制
+        
+        遇到 429 时按 Retry-After 暂停该主机上的所有请求后重试。
         
         Args:
-            paper: 论文信息字典
-            language: 摘要语言 (zh: 中文, en: 英文)
+            max_retries: 429 时的最大重试次数
+            **kwargs: 传给 chat.completions.create 的参数
             
         Returns:
-            生成的摘要文本
+            API 响应
         """
+        limiter = get_rate_limiter()
+        
+        for attempt in range(max_retries + 1):
+            limiter.acquire(self.host)
+            try:
+                return self.client.chat.completions.create(**kwargs)
+            except openai.RateLimitError as e:
+                if attempt == max_retries:
+                    raise
+                headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+                limiter.on_throttled(self.host, parse_retry_after(headers.get('retry-after')))
+    
+    def _summary_messages(self, paper: Dict, language: str = "zh") -> List[Dict]:
+        """构建摘要生成的对话消息"""
         title = paper.get("title", "")
         abstract = paper.get("summary", "")
         
@@ -66,15 +114,159 @@ Abstract: {abstract}
 
 Summary:"""
         
+        return [
+            {"role": "system", "content": "你是一个专业的学术论文分析助手，擅长提取论文的核心创新点。"},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _tags_messages(self, paper: Dict, max_tags: int = 5) -> List[Dict]:
+        """构建标签生成的对话消息"""
+        title = paper.get("title", "")
+        abstract = paper.get("summary", paper.get("abstract", ""))
+        
+        # 构建 prompt
+        prompt = f"""Based on the following academic paper, generate {max_tags} relevant tags/keywords that describe the main topics and methods.
+
+Paper Title: {title}
+
+Abstract: {abstract}
+
+Please provide exactly {max_tags} tags, separated by commas. Tags should be:
+- Specific and relevant
+- Mix of broad topics and specific methods
+- Useful for categorization
+
+Tags:"""
+        
+        return [
+            {"role": "system", "content": "You are an expert at academic paper categorization."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _cache_key(self, kind: str, paper: Dict, **params) -> str:
+        """
+        生成内容寻址的缓存键
+        
+        由模型、提示词版本、生成参数（语言、标签数等）以及论文标题和摘要决定，
+        与论文来自哪个数据源、哪次搜索无关。
+        """
+        title = paper.get("title", "")
+        abstract = paper.get("summary", paper.get("abstract", ""))
+        return self.cache.make_key('llm', kind, self.model, self.PROMPT_VERSION, params, title, abstract)
+    
+    @staticmethod
+    def is_valid_summary(summary: Optional[str]) -> bool:
+        """判断摘要是否为有效的生成结果（非空且不是失败信息）"""
+        return bool(summary) and not summary.startswith(SUMMARY_FAILURE_PREFIX)
+    
+    def _map_cached(
+        self,
+        papers: list,
+        key_for: Callable[[Dict], str],
+        worker: Callable,
+        cacheable: Callable[[Any], bool],
+        progress_callback=None,
+        preset: Optional[Callable[[Dict], Any]] = None,
+        packer: Optional[Callable[[List[Dict]], List[List[int]]]] = None,
+        item_callback: Optional[Callable[[Dict, Any], None]] = None
+    ) -> List[Any]:
+        """
+        先查缓存，只把未命中的论文交给并发引擎
+        
+        Args:
+            papers: 论文列表
+            key_for: 计算论文缓存键的函数
+            worker: 异步生成函数
+            cacheable: 判断结果是否应写入缓存
+            progress_callback: 进度回调函数，接收 (current) 参数
+            preset: 返回论文已有结果的函数（如数据库中已有的摘要），命中时不再生成
+            packer: 将未命中的论文分组的函数；提供时 worker 接收一组论文并返回对应结果列表
+            item_callback: 每篇论文得到结果后立即调用，接收 (paper, result)，用于持久化进度
+            
+        Returns:
+            与 papers 一一对应的结果列表
+        """
+        results: List[Any] = [None] * len(papers)
+        keys: List[Optional[str]] = [None] * len(papers)
+        pending = []
+        
+        for i, paper in enumerate(papers):
+            value = preset(paper) if preset else None
+            if value is None:
+                keys[i] = key_for(paper)
+                value = self.cache.get_json(keys[i])
+            if value is None:
+                pending.append(i)
+            else:
+                results[i] = value
+                if item_callback:
+                    item_callback(paper, value)
+        
+        reused = len(papers) - len(pending)
+        if reused:
+            console.print(f"[green]✓ {reused} 篇论文复用已有结果（缓存/数据库）[/green]")
+            if progress_callback:
+                progress_callback(reused)
+        
+        # 每个任务处理一篇论文，或由 packer 分组后一次处理一组论文
+        if packer:
+            units = [[pending[j] for j in group] for group in packer([papers[i] for i in pending])]
+        else:
+            units = [[i] for i in pending]
+        completed = reused
+        
+        async def run_unit(unit: List[int]) -> List[Any]:
+            nonlocal completed
+            if packer:
+                values = await worker([papers[i] for i in unit])
+            else:
+                values = [await worker(papers[unit[0]])]
+            if item_callback:
+                for i, value in zip(unit, values):
+                    item_callback(papers[i], value)
+            completed += len(unit)
+            if progress_callback:
+                progress_callback(completed)
+            return values
+        
+        for unit, values in zip(units, self.engine.map(units, run_unit)):
+            for i, value in zip(unit, values):
+                results[i] = value
+                if cacheable(value):
+                    self.cache.set_json(keys[i], value)
+        
+        return results
+    
+    @staticmethod
+    def _parse_tags(tags_text: str, max_tags: int) -> List[str]:
+        """解析逗号分隔的标签"""
+        tags = [tag.strip() for tag in tags_text.split(',')]
+        return [tag for tag in tags if tag][:max_tags]
+    
+    def summarize_paper(self, paper: Dict, language: str = "zh") -> str:
+        """
+        生成论文摘要
+        
+        Args:
+            paper: 论文信息字典
+            language: 摘要语言 (zh: 中文, en: 英文)
+            
+        Returns:
+            生成的摘要文本
+        """
+        title = paper.get("title", "")
+        
+        cache_key = self._cache_key('summary', paper, language=language)
+        cached = self.cache.get_json(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             console.print(f"[cyan]🤖 正在生成论文摘要：{title[:50]}...[/cyan]")
             
-            response = self.client.chat.completions.create(
+            response = self._chat(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的学术论文分析助手，擅长提取论文的核心创新点。"},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._summary_messages(paper, language),
                 temperature=0.7,
                 max_tokens=500
             )
@@ -82,44 +274,86 @@ Summary:"""
             summary = response.choices[0].message.content.strip()
             console.print(f"[green]✓ 摘要生成完成[/green]")
             
+            if self.is_valid_summary(summary):
+                self.cache.set_json(cache_key, summary)
             return summary
             
         except Exception as e:
             console.print(f"[red]✗ 生成摘要失败：{str(e)}[/red]")
-            return f"摘要生成失败：{str(e)}"
+            return f"{SUMMARY_FAILURE_PREFIX}：{str(e)}"
     
-    def batch_summarize(self, papers: list, language: str = "zh", delay: float = 1.0, progress_callback=None) -> list:
+    def batch_summarize(
+        self,
+        papers: list,
+        language: str = "zh",
+        delay: Optional[float] = None,
+        progress_callback=None,
+        with_tags: bool = False,
+        max_tags: int = 5,
+        item_callback=None
+    ) -> list:
         """
         批量生成论文摘要
         
+        已有有效 ai_summary（如从数据库回填）或命中缓存的论文不会再调用接口，
+        其余论文通过并发引擎同时发出最多 max_concurrency 个请求，结果顺序与输入一致。
+        
         Args:
             papers: 论文列表
             language: 摘要语言
-            delay: 请求之间的延迟（秒），避免触发 API 限流
+            delay: 已弃用，请求节奏由共享限流器（llm_requests_per_second）控制
             progress_callback: 进度回调函数，接收 (current) 参数
+            with_tags: 同时生成标签，每篇论文只发一次合并请求（见 batch_analyze）
+            max_tags: with_tags 时每篇论文的最大标签数
+            item_callback: 每篇论文完成后调用，接收 (paper, summary)；with_tags 时为 (paper, 分析结果)
             
         Returns:
             包含摘要的论文列表
         """
-        console.print(f"[cyan]📝 开始批量生成 {len(papers)} 篇论文的摘要[/cyan]")
+        if with_tags:
+            return self.batch_analyze(papers, language, max_tags, progress_callback=progress_callback,
+                                      item_callback=item_callback)
         
-        for i, paper in enumerate(papers, 1):
-            console.print(f"\n[yellow]进度：{i}/{len(papers)}[/yellow]")
-            
-            summary = self.summarize_paper(paper, language)
+        console.print(f"[cyan]📝 开始批量生成 {len(papers)} 篇论文的摘要（并发 {self.max_concurrency}）[/cyan]")
+        
+        async def summarize(paper: Dict) -> str:
+            return await self._summarize_async(paper, language)
+        
+        def existing(paper: Dict) -> Optional[str]:
+            summary = paper.get("ai_summary")
+            return summary if self.is_valid_summary(summary) else None
+        
+        summaries = self._map_cached(
+            papers,
+            lambda paper: self._cache_key('summary', paper, language=language),
+            summarize,
+            self.is_valid_summary,
+            progress_callback,
+            preset=existing,
+            item_callback=item_callback
+        )
+        for paper, summary in zip(papers, summaries):
             paper["ai_summary"] = summary
-            
-            # 调用progress回调
-            if progress_callback:
-                progress_callback(i)
-            
-            # 延迟以避免 API 限流
-            if i < len(papers):
-                time.sleep(delay)
         
         console.print(f"\n[green]✓ 所有摘要生成完成！[/green]")
         return papers
     
+    async def _summarize_async(self, paper: Dict, language: str) -> str:
+        """通过并发引擎生成单篇摘要，失败时返回失败信息"""
+        try:
+            response = await self.engine.chat(
+                model=self.model,
+                messages=self._summary_messages(paper, language),
+                temperature=0.7,
+                max_tokens=500
+            )
+            summary = response.choices[0].message.content.strip()
+            console.print(f"[green]✓ 摘要生成完成：{paper.get('title', '')[:50]}[/green]")
+            return summary
+        except Exception as e:
+            console.print(f"[red]✗ 生成摘要失败：{str(e)}[/red]")
+            return f"{SUMMARY_FAILURE_PREFIX}：{str(e)}"
+    
     def generate_tags(self, paper: Dict, max_tags: int = 5) -> List[str]:
         """
         为论文生成标签/关键词
@@ -131,42 +365,25 @@ Summary:"""
         Returns:
             标签列表
         """
-        title = paper.get("title", "")
-        abstract = paper.get("summary", paper.get("abstract", ""))
-        
-        if not title and not abstract:
+        if not paper.get("title") and not paper.get("summary", paper.get("abstract")):
             return []
         
-        # 构建 prompt
-        prompt = f"""Based on the following academic paper, generate {max_tags} relevant tags/keywords that describe the main topics and methods.
-
-Paper Title: {title}
-
-Abstract: {abstract}
-
-Please provide exactly {max_tags} tags, separated by commas. Tags should be:
-- Specific and relevant
-- Mix of broad topics and specific methods
-- Useful for categorization
-
-Tags:"""
+        cache_key = self._cache_key('tags', paper, max_tags=max_tags)
+        cached = self.cache.get_json(cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            response = self.client.chat.completions.create(
+            response = self._chat(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at academic paper categorization."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._tags_messages(paper, max_tags),
                 temperature=0.5,
                 max_tokens=100
             )
             
-            tags_text = response.choices[0].message.content.strip()
-            # 解析标签
-            tags = [tag.strip() for tag in tags_text.split(',')]
-            tags = [tag for tag in tags if tag][:max_tags]
-            
+            tags = self._parse_tags(response.choices[0].message.content.strip(), max_tags)
+            if tags:
+                self.cache.set_json(cache_key, tags)
             return tags
             
         except Exception as e:
@@ -177,37 +394,414 @@ Tags:"""
         self,
         papers: list,
         max_tags: int = 5,
-        progress_callback=None
+        progress_callback=None,
+        packed: bool = True,
+        item_callback=None
     ) -> list:
         """
         批量生成论文标签
         
+        已带有标签的论文（如已经过 batch_analyze）直接跳过。打包模式下，多篇论文按
+        pack_token_budget 分组后合并为一次请求，解析失败的论文回退为单篇请求。
+        
         Args:
             papers: 论文列表
             max_tags: 每篇论文的最大标签数
             progress_callback: 进度回调
+            packed: 是否将多篇论文打包到同一请求
+            item_callback: 每篇论文完成后调用，接收 (paper, tags)
             
         Returns:
             包含标签的论文列表
         """
-        console.print(f"[cyan]🏷️  开始生成论文标签...[/cyan]")
+        packed = packed and self.pack_token_budget > 0
+        console.print(f"[cyan]🏷️  开始生成论文标签...{'（打包模式）' if packed else ''}[/cyan]")
+        
+        async def tag(paper: Dict) -> List[str]:
+            return await self._tags_async(paper, max_tags)
         
-        for i, paper in enumerate(papers, 1):
-            tags = self.generate_tags(paper, max_tags)
+        async def tag_pack(pack: List[Dict]) -> List[List[str]]:
+            return await self._tags_packed_async(pack, max_tags)
+        
+        all_tags = self._map_cached(
+            papers,
+            lambda paper: self._cache_key('tags', paper, max_tags=max_tags),
+            tag_pack if packed else tag,
+            bool,
+            progress_callback,
+            preset=lambda paper: paper.get('tags') or None,
+            packer=(lambda pending: self._pack_papers(pending, max_tags)) if packed else None,
+            item_callback=item_callback
+        )
+        for paper, tags in zip(papers, all_tags):
             paper['tags'] = tags
+        
+        console.print(f"[green]✓ 标签生成完成！[/green]")
+        return papers
+    
+    async def _tags_async(self, paper: Dict, max_tags: int) -> List[str]:
+        """通过并发引擎生成单篇标签，失败时返回空列表"""
+        if not paper.get("title") and not paper.get("summary", paper.get("abstract")):
+            return []
+        try:
+            response = await self.engine.chat(
+                model=self.model,
+                messages=self._tags_messages(paper, max_tags),
+                temperature=0.5,
+                max_tokens=100
+            )
+            tags = self._parse_tags(response.choices[0].message.content.strip(), max_tags)
+        except Exception as e:
+            console.print(f"[yellow]⚠ 标签生成失败: {str(e)}[/yellow]")
+            return []
+        
+        if tags:
+            console.print(f"[green]✓ {paper.get('title', '')[:40]}... | 标签: {', '.join(tags[:3])}{'...' if len(tags) > 3 else ''}[/green]")
+        return tags
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """粗略估计 token 数：ASCII 约 4 字符一个 token，其他字符（如中文）约一字一个"""
+        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+        return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+    
+    def _pack_papers(self, papers: List[Dict], max_tags: int) -> List[List[int]]:
+        """
+        按 token 预算将论文分组
+        
+        每篇论文的开销为其标题和摘要的输入 token 加上预计的输出 token，
+        累计超出 pack_token_budget 时开始新的一组；单篇超出预算的论文单独成组。
+        
+        Args:
+            papers: 论文列表
+            max_tags: 每篇论文的最大标签数
             
+        Returns:
+            分组后的下标列表
+        """
+        groups: List[List[int]] = []
+        current: List[int] = []
+        used = self.PACK_PROMPT_TOKENS
+        
+        for i, paper in enumerate(papers):
+            text = (paper.get("title") or "") + (paper.get("summary") or paper.get("abstract") or "")
+            cost = self._estimate_tokens(text) + self.PACK_TOKENS_PER_TAG * max_tags + 20
+            if current and used + cost > self.pack_token_budget:
+                groups.append(current)
+                current, used = [], self.PACK_PROMPT_TOKENS
+            current.append(i)
+            used += cost
+        
+        if current:
+            groups.append(current)
+        return groups
+    
+    def _packed_tags_messages(self, papers: List[Dict], max_tags: int) -> List[Dict]:
+        """构建多篇论文打包标签生成的对话消息"""
+        sections = []
+        for number, paper in enumerate(papers, 1):
+            title = paper.get("title", "")
+            abstract = paper.get("summary", paper.get("abstract", ""))
+            sections.append(f"[{number}]\nPaper Title: {title}\nAbstract: {abstract}")
+        papers_text = "\n\n".join(sections)
+        
+        prompt = f"""Below are {len(papers)} academic papers, each in a numbered section. For each paper, generate {max_tags} relevant tags/keywords that describe its main topics and methods.
+
+Tags should be:
+- Specific and relevant
+- Mix of broad topics and specific methods
+- Useful for categorization
+
+{papers_text}
+
+Respond with a single JSON object mapping each section number to its array of exactly {max_tags} tags, e.g. {{"1": ["tag", ...], "2": ["tag", ...]}}."""
+        
+        return [
+            {"role": "system", "content": "You are an expert at academic paper categorization. Output JSON only."},
+            {"role": "user", "content": prompt}
+        ]
+    
+    @staticmethod
+    def _parse_packed_tags(text: str, count: int, max_tags: int) -> List[Optional[List[str]]]:
+        """
+        解析打包响应，返回每篇论文的标签；缺失或格式不符的论文对应 None
+        """
+        results: List[Optional[List[str]]] = [None] * count
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return results
+        
+        # 兼容 {"papers": {...}} 这类多包一层的响应，以及直接返回数组的响应
+        if isinstance(data, dict) and len(data) == 1:
+            key, inner = next(iter(data.items()))
+            if not str(key).strip().isdigit() and isinstance(inner, (dict, list)):
+                data = inner
+        if isinstance(data, list):
+            data = {str(i): value for i, value in enumerate(data, 1)}
+        if not isinstance(data, dict):
+            return results
+        
+        for key, value in data.items():
+            key = str(key).strip().strip('[]')
+            if not key.isdigit() or not 1 <= int(key) <= count:
+                continue
+            if isinstance(value, str):
+                value = value.split(',')
+            if not isinstance(value, list):
+                continue
+            tags = [str(tag).strip() for tag in value if str(tag).strip()][:max_tags]
             if tags:
+                results[int(key) - 1] = tags
+        
+        return results
+    
+    async def _tags_packed_async(self, papers: List[Dict], max_tags: int) -> List[List[str]]:
+        """
+        一次请求为一组论文生成标签，响应缺失的论文回退为单篇请求
+        """
+        if len(papers) == 1:
+            return [await self._tags_async(papers[0], max_tags)]
+        
+        results: List[Optional[List[str]]] = [None] * len(papers)
+        kwargs = {"response_format": {"type": "json_object"}} if self.json_mode else {}
+        try:
+            response = await self.engine.chat(
+                model=self.model,
+                messages=self._packed_tags_messages(papers, max_tags),
+                temperature=0.5,
+                max_tokens=len(papers) * (self.PACK_TOKENS_PER_TAG * max_tags + 10) + 50,
+                **kwargs
+            )
+            results = self._parse_packed_tags(
+                response.choices[0].message.content.strip(), len(papers), max_tags
+            )
+        except openai.BadRequestError as e:
+            # 多数情况是接口不支持 response_format，后续请求不再尝试
+            self.json_mode = False
+            console.print(f"[yellow]⚠ 打包请求被拒绝，改为单篇生成: {str(e)}[/yellow]")
+        except Exception as e:
+            console.print(f"[yellow]⚠ 打包标签生成失败，改为单篇生成: {str(e)}[/yellow]")
+        
+        missing = [i for i, tags in enumerate(results) if tags is None]
+        if missing and len(missing) < len(papers):
+            console.print(f"[yellow]⚠ 打包响应缺少 {len(missing)} 篇论文的标签，改为单篇生成[/yellow]")
+        for i, tags in enumerate(results):
+            if tags:
+                paper = papers[i]
                 console.print(f"[green]✓ {paper.get('title', '')[:40]}... | 标签: {', '.join(tags[:3])}{'...' if len(tags) > 3 else ''}[/green]")
+        
+        fallback = await asyncio.gather(*(self._tags_async(papers[i], max_tags) for i in missing))
+        for i, tags in zip(missing, fallback):
+            results[i] = tags
+        return results
+    
+    def _analysis_messages(
+        self,
+        paper: Dict,
+        language: str = "zh",
+        max_tags: int = 5,
+        include_methods: bool = False
+    ) -> List[Dict]:
+        """构建合并分析（摘要 + 标签 + 关键方法）的对话消息"""
+        title = paper.get("title", "")
+        abstract = paper.get("summary", paper.get("abstract", ""))
+        
+        if language == "zh":
+            summary_spec = "用中文总结论文的核心创新点：200 字以内，突出主要贡献，语言学术但易懂，多个创新点时分点列出"
+        else:
+            summary_spec = ("the core innovations of the paper in English: within 200 words, highlighting "
+                            "main contributions, clear academic language, bullet points if there are several")
+        
+        fields = [
+            f'"summary": {summary_spec}',
+            f'"tags": an array of exactly {max_tags} English tags/keywords mixing broad topics and specific methods',
+        ]
+        if include_methods:
+            fields.append('"key_methods": an array of the key methods, models or techniques the paper uses')
+        field_lines = "\n".join(f"- {field}" for field in fields)
+        
+        prompt = f"""Analyze the following academic paper and respond with a single JSON object containing:
+{field_lines}
+
+Paper Title: {title}
+
+Abstract: {abstract}"""
+        
+        return [
+            {"role": "system", "content": "你是一个专业的学术论文分析助手，擅长提取论文的核心创新点并进行分类。只输出 JSON。"},
+            {"role": "user", "content": prompt}
+        ]
+    
+    @staticmethod
+    def _parse_analysis(text: str, max_tags: int, include_methods: bool) -> Optional[Dict]:
+        """解析合并分析的 JSON 响应，格式不符时返回 None"""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        
+        summary = data.get("summary")
+        if isinstance(summary, list):
+            summary = "\n".join(str(item) for item in summary)
+        if not isinstance(summary, str) or not summary.strip():
+            return None
+        
+        def as_list(value, limit=None) -> List[str]:
+            if isinstance(value, str):
+                value = value.split(',')
+            if not isinstance(value, list):
+                return []
+            items = [str(item).strip() for item in value if str(item).strip()]
+            return items[:limit] if limit else items
+        
+        tags = as_list(data.get("tags"), max_tags)
+        if not tags:
+            return None
+        
+        return {
+            "summary": summary.strip(),
+            "tags": tags,
+            "key_methods": as_list(data.get("key_methods")) if include_methods else []
+        }
+    
+    async def _analyze_async(
+        self,
+        paper: Dict,
+        language: str,
+        max_tags: int,
+        include_methods: bool
+    ) -> Dict:
+        """
+        一次请求同时生成摘要、标签（和关键方法）
+        
+        响应无法解析或接口不支持 JSON 模式时，回退为分别生成摘要和标签。
+        """
+        if self.json_mode:
+            try:
+                response = await self.engine.chat(
+                    model=self.model,
+                    messages=self._analysis_messages(paper, language, max_tags, include_methods),
+                    temperature=0.5,
+                    max_tokens=800 if include_methods else 600,
+                    response_format={"type": "json_object"}
+                )
+                result = self._parse_analysis(
+                    response.choices[0].message.content.strip(), max_tags, include_methods
+                )
+                if result is not None:
+                    console.print(f"[green]✓ 分析完成：{paper.get('title', '')[:40]}... | 标签: {', '.join(result['tags'][:3])}[/green]")
+                    return result
+                console.print(f"[yellow]⚠ 分析结果格式不正确，改为分别生成：{paper.get('title', '')[:40]}[/yellow]")
+            except openai.BadRequestError as e:
+                # 多数情况是接口不支持 response_format，后续请求不再尝试
+                self.json_mode = False
+                console.print(f"[yellow]⚠ 接口不支持 JSON 模式，改为分别生成摘要和标签: {str(e)}[/yellow]")
+            except Exception as e:
+                console.print(f"[yellow]⚠ 合并分析失败，改为分别生成: {str(e)}[/yellow]")
+        
+        summary = await self._summarize_async(paper, language)
+        tags = await self._tags_async(paper, max_tags)
+        return {"summary": summary, "tags": tags, "key_methods": []}
+    
+    def analyze_paper(
+        self,
+        paper: Dict,
+        language: str = "zh",
+        max_tags: int = 5,
+        include_methods: bool = False
+    ) -> Dict:
+        """
+        单次请求生成论文摘要、标签和关键方法
+        
+        Args:
+            paper: 论文信息字典
+            language: 摘要语言 (zh: 中文, en: 英文)
+            max_tags: 最大标签数量
+            include_methods: 是否同时提取关键方法
             
-            # 回调进度
-            if progress_callback:
-                progress_callback(i)
+        Returns:
+            包含 summary、tags、key_methods 的字典
+        """
+        return self._analyze_many([paper], language, max_tags, include_methods)[0]
+    
+    def _analyze_many(
+        self,
+        papers: list,
+        language: str,
+        max_tags: int,
+        include_methods: bool,
+        progress_callback=None,
+        item_callback=None
+    ) -> List[Dict]:
+        """合并分析多篇论文，复用已有结果和缓存，返回与 papers 对应的结果列表"""
+        async def analyze(paper: Dict) -> Dict:
+            return await self._analyze_async(paper, language, max_tags, include_methods)
+        
+        def existing(paper: Dict) -> Optional[Dict]:
+            if not self.is_valid_summary(paper.get("ai_summary")) or not paper.get("tags"):
+                return None
+            if include_methods and not paper.get("key_methods"):
+                return None
+            return {
+                "summary": paper["ai_summary"],
+                "tags": paper["tags"],
+                "key_methods": paper.get("key_methods", [])
+            }
+        
+        def cacheable(result: Dict) -> bool:
+            return self.is_valid_summary(result["summary"]) and bool(result["tags"])
+        
+        return self._map_cached(
+            papers,
+            lambda paper: self._cache_key(
+                'analysis', paper, language=language, max_tags=max_tags, include_methods=include_methods
+            ),
+            analyze,
+            cacheable,
+            progress_callback,
+            preset=existing,
+            item_callback=item_callback
+        )
+    
+    def batch_analyze(
+        self,
+        papers: list,
+        language: str = "zh",
+        max_tags: int = 5,
+        include_methods: bool = False,
+        progress_callback=None,
+        item_callback=None
+    ) -> list:
+        """
+        批量合并分析：每篇论文一次请求同时得到摘要、标签和关键方法
+        
+        与先后调用 batch_summarize 和 batch_generate_tags 相比，标题和摘要只发送一次，
+        请求数和输入 token 约减半。
+        
+        Args:
+            papers: 论文列表
+            language: 摘要语言
+            max_tags: 每篇论文的最大标签数
+            include_methods: 是否同时提取关键方法（写入 key_methods 字段）
+            progress_callback: 进度回调函数，接收 (current) 参数
+            item_callback: 每篇论文完成后调用，接收 (paper, 分析结果)
             
-            # 延迟避免API限流
-            if i < len(papers):
-                time.sleep(0.5)
+        Returns:
+            包含 ai_summary、tags（和 key_methods）的论文列表
+        """
+        console.print(f"[cyan]🔬 开始分析 {len(papers)} 篇论文：摘要 + 标签（并发 {self.max_concurrency}）[/cyan]")
         
-        console.print(f"[green]✓ 标签生成完成！[/green]")
+        results = self._analyze_many(papers, language, max_tags, include_methods, progress_callback, item_callback)
+        for paper, result in zip(papers, results):
+            paper["ai_summary"] = result["summary"]
+            paper["tags"] = result["tags"]
+            if include_methods:
+                paper["key_methods"] = result["key_methods"]
+        
+        console.print(f"\n[green]✓ 所有论文分析完成！[/green]")
         return papers
     
     def test_connection(self) -> bool:
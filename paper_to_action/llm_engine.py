@@ -0,0 +1,168 @@
+"""
+LLM 并发引擎 - 基于 asyncio 的有界并发调用，遇到 429 自适应退避
+"""
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+import openai
+from .rate_limit import get_rate_limiter, parse_retry_after
+
+
+def run_sync(coro):
+    """
+    在同步代码中运行协程
+
+    当前线程已有运行中的事件循环时（如 Jupyter），改为在独立线程中运行。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class AsyncLLMEngine:
+    """并发调用 chat.completions 的执行引擎"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.openai.com/v1",
+        max_concurrency: int = 8,
+        max_retries: int = 5,
+        base_backoff: float = 1.0
+    ):
+        """
+        初始化引擎
+
+        Args:
+            api_key: API 密钥
+            base_url: API 基础 URL
+            max_concurrency: 同时进行的最大请求数
+            max_retries: 429 时的最大重试次数
+            base_backoff: 无 Retry-After 时的初始退避时间（秒）
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.host = get_rate_limiter().host_of(base_url)
+
+        # 以下状态在每次 map() 时于事件循环内重建
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._condition: Optional[asyncio.Condition] = None
+        self._active = 0
+        self._limit = self.max_concurrency
+        self._successes = 0
+
+    async def _acquire_slot(self):
+        """等待并发槽位（上限随限流信号动态调整）"""
+        async with self._condition:
+            while self._active >= self._limit:
+                await self._condition.wait()
+            self._active += 1
+
+    async def _release_slot(self):
+        async with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def _on_success(self):
+        # 加性增：连续成功后逐步恢复并发度
+        self._successes += 1
+        if self._limit < self.max_concurrency and self._successes >= self._limit:
+            self._limit += 1
+            self._successes = 0
+
+    def _on_throttled(self):
+        # 乘性减：收到 429 立即将并发度减半
+        self._limit = max(1, self._limit // 2)
+        self._successes = 0
+
+    async def chat(self, **kwargs):
+        """
+        发送一次 chat.completions 请求（仅可在 map() 的 worker 中调用）
+
+        Args:
+            **kwargs: 传给 chat.completions.create 的参数
+
+        Returns:
+            API 响应
+        """
+        limiter = get_rate_limiter()
+
+        for attempt in range(self.max_retries + 1):
+            await self._acquire_slot()
+            try:
+                wait = limiter.reserve(self.host)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                response = await self._client.chat.completions.create(**kwargs)
+                self._on_success()
+                return response
+            except openai.RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                self._on_throttled()
+                headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+                delay = parse_retry_after(headers.get('retry-after'))
+                if delay is None:
+                    delay = self.base_backoff * (2 ** attempt) + random.uniform(0, self.base_backoff)
+                limiter.on_throttled(self.host, delay)
+            finally:
+                await self._release_slot()
+
+    def map(
+        self,
+        items: Sequence[Any],
+        worker: Callable[[Any], Awaitable[Any]],
+        progress_callback=None
+    ) -> List[Any]:
+        """
+        并发处理所有条目，结果顺序与输入一致
+
+        Args:
+            items: 待处理条目
+            worker: 异步处理函数，内部通过 self.chat() 调用模型
+            progress_callback: 进度回调函数，接收已完成数量 (current)
+
+        Returns:
+            与 items 一一对应的结果列表
+        """
+        if not items:
+            return []
+        return run_sync(self._map(items, worker, progress_callback))
+
+    async def _map(self, items, worker, progress_callback) -> List[Any]:
+        self._client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        self._condition = asyncio.Condition()
+        self._active = 0
+        self._limit = self.max_concurrency
+        self._successes = 0
+
+        results: List[Any] = [None] * len(items)
+        completed = 0
+
+        async def run_one(index: int, item: Any):
+            results[index] = await worker(item)
+
+        tasks = [asyncio.ensure_future(run_one(i, item)) for i, item in enumerate(items)]
+        try:
+            for future in asyncio.as_completed(tasks):
+                await future
+                completed += 1
+                if progress_callback:
+                    progress_callback(completed)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            await self._client.close()
+            self._client = None
+
+        return results
@@ -3,10 +3,17 @@ PDF 下载模块 - 用于下载 ArXiv 论文 PDF
 """
 import requests
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+from .blob_store import BlobStore, get_blob_store
+from .database import Database
+from .http_client import get_session
+from .rate_limit import RateLimiter, TokenBucket
 import time
 
 console = Console()
@@ -35,7 +42,22 @@ class DownloadStats:
 class PDFDownloader:
     """ArXiv PDF 下载器"""
     
-    def __init__(self, output_dir: str = "papers/pdfs", timeout: int = 30, max_retries: int = 3):
+    # 写入文件与带宽限速的块大小
+    CHUNK_SIZE = 8192
+    # PDF 文件头
+    PDF_MAGIC = b'%PDF-'
+    
+    def __init__(
+        self,
+        output_dir: str = "papers/pdfs",
+        timeout: int = 30,
+        max_retries: int = 3,
+        max_workers: int = 4,
+        per_host_limit: int = 2,
+        max_bandwidth: Optional[float] = None,
+        blob_store: Optional[BlobStore] = None,
+        manifest: Optional[Database] = None
+    ):
         """
         初始化 PDF 下载器
         
@@ -43,10 +65,28 @@ class PDFDownloader:
             output_dir: PDF 保存目录
             timeout: 下载超时时间（秒）
             max_retries: 最大重试次数
+            max_workers: 批量下载的并发线程数，1 表示逐篇下载
+            per_host_limit: 同一主机同时进行的下载数上限
+            max_bandwidth: 所有下载合计的带宽上限（字节/秒），None 表示不限
+            blob_store: PDF 内容存储，None 表示使用全局存储
+            manifest: 记录下载清单的数据库，提供时按论文 ID 判断是否已下载，None 表示按文件名查找
         """
         self.output_dir = output_dir
+        # 下载的 PDF 按内容去重，按标题命名的文件只是指向存储对象的链接
+        self.blob_store = blob_store or get_blob_store()
+        self.manifest = manifest
         self.timeout = timeout
         self.max_retries = max_retries
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        
+        # 全局带宽令牌桶，令牌单位为字节，允许约 1 秒的突发
+        self._bandwidth = None
+        if max_bandwidth:
+            self._bandwidth = TokenBucket(float(max_bandwidth), max(float(max_bandwidth), self.CHUNK_SIZE))
+        
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
         
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
@@ -90,54 +130,188 @@ class PDFDownloader:
         
         return f"{clean_id}_{safe_title}.pdf"
     
-    def download_with_retry(self, url: str, filepath: str) -> Tuple[bool, Optional[str]]:
+    @contextmanager
+    def _host_slot(self, url: str):
+        """占用目标主机的一个下载名额，超出 per_host_limit 时等待"""
+        host = RateLimiter.host_of(url)
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+        with slot:
+            yield
+    
+    def verify_pdf(self, filepath: str, expected_size: Optional[int] = None) -> Optional[str]:
+        """
+        校验 PDF 文件是否完整
+        
+        Args:
+            filepath: 文件路径
+            expected_size: 服务端声明的文件大小，None 表示未知
+            
+        Returns:
+            校验失败的原因，通过时返回 None
+        """
+        try:
+            file_size = os.path.getsize(filepath)
+            with open(filepath, 'rb') as f:
+                header = f.read(len(self.PDF_MAGIC))
+                # 完整的 PDF 以 %%EOF 结尾（其后可能有少量空白）
+                f.seek(max(0, file_size - 1024))
+                trailer = f.read()
+        except OSError as e:
+            return f"无法读取文件: {str(e)}"
+        
+        if file_size < 1000:  # 小于 1KB 可能是错误页面
+            return f"文件过小 ({file_size} bytes)，可能不是有效的 PDF"
+        if expected_size is not None and file_size != expected_size:
+            return f"文件不完整 ({file_size}/{expected_size} bytes)"
+        if header != self.PDF_MAGIC:
+            return "文件不是有效的 PDF（缺少 %PDF- 文件头）"
+        if b'%%EOF' not in trailer:
+            return "文件不完整（缺少 %%EOF 结束标记）"
+        return None
+    
+    @staticmethod
+    def _discard_part(part_path: str):
+        """删除临时文件及其 ETag 记录"""
+        for path in (part_path, part_path + '.etag'):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _fetch(self, url: str, part_path: str) -> Tuple[int, str, Optional[int], Optional[str]]:
+        """
+        在主机名额内请求 URL，把响应写入 .part 临时文件
+        
+        首次响应的 ETag 保存在 .part.etag 中。临时文件已有内容时发送 Range 和 If-Range
+        请求从断点续传；服务端返回 200（文件已变或不支持 Range），或 206 的 ETag 与临时
+        文件不符时从头写入，避免把新旧两个版本拼在一起（如 arXiv 未带版本号的 PDF 链接）。
+        开启带宽上限时，每写入一块先从全局令牌桶领取对应字节数。
+        
+        Args:
+            url: 下载 URL
+            part_path: 临时文件路径
+            
+        Returns:
+            (HTTP 状态码, Content-Type, 完整文件的预期大小, ETag)
+        """
+        etag_path = part_path + '.etag'
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        saved_etag = None
+        if os.path.exists(etag_path):
+            with open(etag_path, 'r', encoding='utf-8') as f:
+                saved_etag = f.read().strip() or None
+        if offset and (not saved_etag or saved_etag.startswith('W/')):
+            # 无法确认临时文件来自哪个版本（弱 ETag 不能用于 If-Range），从头下载
+            self._discard_part(part_path)
+            offset = 0
+        
+        headers = {'User-Agent': 'Mozilla/5.0 (PaperSeek Bot)'}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = saved_etag
+        
+        restart = False
+        with self._host_slot(url):
+            response = get_session().get(url, timeout=self.timeout, headers=headers, stream=True)
+            try:
+                status_code = response.status_code
+                content_type = response.headers.get('Content-Type', '')
+                etag = response.headers.get('ETag') or (saved_etag if status_code == 416 else None)
+                expected_size = None
+                
+                if status_code == 206:
+                    # Content-Range: bytes <start>-<end>/<total>
+                    content_range = response.headers.get('Content-Range', '')
+                    span, _, total = content_range.replace('bytes', '').strip().partition('/')
+                    expected_size = int(total) if total.isdigit() else None
+                    # 区间与断点不符，或服务端文件已变：丢弃临时文件重新下载
+                    restart = span.split('-')[0].strip() != str(offset) or etag != saved_etag
+                elif status_code == 200:
+                    length = response.headers.get('Content-Length', '')
+                    expected_size = int(length) if length.isdigit() else None
+                
+                if not restart and status_code in (200, 206) and 'application/pdf' in content_type:
+                    if status_code == 200:
+                        # 从头写入，记录本次内容的 ETag 供续传时校验
+                        if etag:
+                            with open(etag_path, 'w', encoding='utf-8') as f:
+                                f.write(etag)
+                        elif os.path.exists(etag_path):
+                            os.remove(etag_path)
+                    with open(part_path, 'ab' if status_code == 206 else 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                            if chunk:
+                                if self._bandwidth is not None:
+                                    self._bandwidth.acquire(len(chunk))
+                                f.write(chunk)
+                if not restart:
+                    return status_code, content_type, expected_size, etag
+            finally:
+                response.close()
+        
+        # 释放主机名额后再发起完整请求（临时文件已删除，不会再次续传）
+        self._discard_part(part_path)
+        return self._fetch(url, part_path)
+    
+    def download_with_retry(self, url: str, filepath: str, meta: Optional[Dict] = None) -> Tuple[bool, Optional[str]]:
         """
         带重试的下载
         
+        先写入 filepath + '.part'，中断后用 Range/If-Range 请求续传，校验通过后存入内容存储，
+        并在 filepath 建立链接；失败时保留临时文件，下次下载从断点继续。
+        
         Args:
             url: 下载 URL
             filepath: 保存路径
+            meta: 可选的字典，成功时写入 size、sha256 和 etag
             
         Returns:
             (成功与否, 错误信息)
         """
+        part_path = filepath + '.part'
+        
         for attempt in range(self.max_retries):
             try:
-                response = requests.get(
-                    url,
-                    timeout=self.timeout,
-                    headers={'User-Agent': 'Mozilla/5.0 (PaperSeek Bot)'},
-                    stream=True
-                )
+                status_code, content_type, expected_size, etag = self._fetch(url, part_path)
                 
-                if response.status_code == 200:
-                    # 检查是否真的是 PDF
-                    content_type = response.headers.get('Content-Type', '')
-                    if 'application/pdf' not in content_type:
+                if status_code in (200, 206, 416):
+                    # 检查是否真的是 PDF（416 表示临时文件已完整，无需检查响应）
+                    if status_code != 416 and 'application/pdf' not in content_type:
                         return False, f"响应不是 PDF 文件 (Content-Type: {content_type})"
                     
-                    # 保存文件
-                    with open(filepath, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
+                    # 未收完预期字节数，从断点续传
+                    current = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                    if expected_size is not None and current < expected_size:
+                        error_msg = f"下载中断 ({current}/{expected_size} bytes)"
+                        if attempt < self.max_retries - 1:
+                            time.sleep(2 ** attempt)
+                            continue
+                        return False, error_msg
                     
-                    # 验证文件大小
-                    file_size = os.path.getsize(filepath)
-                    if file_size < 1000:  # 小于 1KB 可能是错误页面
-                        os.remove(filepath)
-                        return False, f"文件过小 ({file_size} bytes)，可能不是有效的 PDF"
+                    # 验证文件头与大小
+                    error = self.verify_pdf(part_path, expected_size)
+                    if error:
+                        self._discard_part(part_path)
+                        if status_code == 416 and attempt < self.max_retries - 1:
+                            continue
+                        return False, error
                     
+                    size = os.path.getsize(part_path)
+                    digest = self.blob_store.put(part_path, filepath)
+                    self._discard_part(part_path)
+                    if meta is not None:
+                        meta.update(size=size, sha256=digest, etag=etag)
                     return True, None
                 
-                elif response.status_code == 404:
+                elif status_code == 404:
                     return False, "PDF 不存在 (404)"
                 
-                elif response.status_code == 403:
+                elif status_code == 403:
                     return False, "访问被拒绝 (403)"
                 
                 else:
-                    error_msg = f"HTTP {response.status_code}"
+                    error_msg = f"HTTP {status_code}"
                     if attempt < self.max_retries - 1:
                         wait_time = 2 ** attempt  # 指数退避: 1s, 2s, 4s
                         time.sleep(wait_time)
@@ -152,7 +326,7 @@ class PDFDownloader:
                     continue
                 return False, error_msg
                 
-            except requests.exceptions.ConnectionError:
+            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
                 error_msg = "连接失败"
                 if attempt < self.max_retries - 1:
                     wait_time = 2 ** attempt
@@ -165,6 +339,41 @@ class PDFDownloader:
         
         return False, f"重试 {self.max_retries} 次后仍然失败"
     
+    def _lookup_manifest(self, source: str, source_id: str, filepath: str) -> Optional[str]:
+        """
+        在下载清单中查找论文的 PDF
+        
+        清单中的文件仍在且大小一致时直接使用；文件已被删除或移走、但内容仍在存储中时，
+        在 filepath 重建链接。
+        
+        Returns:
+            可用的 PDF 路径，未下载过时返回 None
+        """
+        if self.manifest is None or not source_id:
+            return None
+        
+        entry = self.manifest.get_download(source, source_id)
+        if not entry:
+            return None
+        
+        path = entry['path']
+        if os.path.exists(path) and os.path.getsize(path) == entry['size']:
+            return path
+        
+        digest = entry['sha256']
+        if digest and self.blob_store.blob_path(digest).exists():
+            self.blob_store.link(digest, filepath)
+            self._record(source, source_id, filepath, entry['size'], digest,
+                         etag=entry['etag'], url=entry['url'])
+            return filepath
+        return None
+    
+    def _record(self, source: str, source_id: str, path: str, size: int, sha256: str,
+                etag: Optional[str] = None, url: Optional[str] = None):
+        """把下载结果写入清单（未提供清单时忽略）"""
+        if self.manifest is not None and source_id:
+            self.manifest.record_download(source, source_id, path, size, sha256, etag=etag, url=url)
+    
     def download_paper(self, paper: Dict) -> DownloadResult:
         """
         下载单篇论文的 PDF
@@ -191,18 +400,35 @@ class PDFDownloader:
         filename = self.sanitize_filename(title, arxiv_id)
         filepath = os.path.join(self.output_dir, filename)
         
-        # 检查文件是否已存在
-        if os.path.exists(filepath):
+        # 先查下载清单，标题变化或文件被移走后也能找到已下载的 PDF
+        source, source_id = Database.download_key(paper)
+        existing = self._lookup_manifest(source, source_id, filepath)
+        
+        # 不在清单中时检查文件是否已存在且完整，损坏的文件重新下载
+        if existing is None and os.path.exists(filepath) and self.verify_pdf(filepath) is None:
+            # 引入存储之前下载的文件（没有其他硬链接）原地入库
+            if os.stat(filepath).st_nlink == 1:
+                digest = self.blob_store.put(filepath)
+            else:
+                digest = self.blob_store.digest_file(filepath)
+            self._record(source, source_id, filepath, os.path.getsize(filepath), digest, url=pdf_url)
+            existing = filepath
+        
+        if existing is not None:
             return DownloadResult(
                 paper_id=arxiv_id,
                 title=title,
                 success=True,
-                file_path=filepath,
+                file_path=existing,
                 url=pdf_url
             )
         
         # 下载
-        success, error = self.download_with_retry(pdf_url, filepath)
+        meta: Dict = {}
+        success, error = self.download_with_retry(pdf_url, filepath, meta)
+        if success:
+            self._record(source, source_id, filepath, meta['size'], meta['sha256'],
+                         etag=meta.get('etag'), url=pdf_url)
         
         return DownloadResult(
             paper_id=arxiv_id,
@@ -216,38 +442,54 @@ class PDFDownloader:
     def batch_download(
         self, 
         papers: List[Dict], 
-        progress_callback=None
+        progress_callback=None,
+        item_callback=None
     ) -> DownloadStats:
         """
         批量下载论文 PDF
         
+        max_workers 个线程并发下载，同一主机的并发数受 per_host_limit 限制。
+        结果顺序与输入一致，进度回调按完成顺序递增。
+        
         Args:
             papers: 论文列表
             progress_callback: 进度回调函数，接收 (current, total) 参数
+            item_callback: 每篇论文下载结束后调用，接收 (paper, DownloadResult)
             
         Returns:
             下载统计
         """
-        results = []
+        results: List[Optional[DownloadResult]] = [None] * len(papers)
         successful = 0
         failed = 0
         
-        for i, paper in enumerate(papers, 1):
-            result = self.download_paper(paper)
-            results.append(result)
+        # 回调均在调用线程中执行，请求节奏由共享限流器控制
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.download_paper, paper): i for i, paper in enumerate(papers)}
             
-            if result.success:
-                successful += 1
-            else:
-                failed += 1
-            
-            # 回调进度
-            if progress_callback:
-                progress_callback(i)
-            
-            # 小延迟，避免过快请求
-            if i < len(papers):
-                time.sleep(0.5)
+            for completed, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    paper = papers[i]
+                    result = DownloadResult(
+                        paper_id=paper.get('arxiv_id', ''),
+                        title=paper.get('title', 'untitled'),
+                        success=False,
+                        error=f"未知错误: {str(e)}"
+                    )
+                results[i] = result
+                if item_callback:
+                    item_callback(papers[i], result)
+                
+                if result.success:
+                    successful += 1
+                else:
+                    failed += 1
+                
+                if progress_callback:
+                    progress_callback(completed)
         
         return DownloadStats(
             total=len(papers),
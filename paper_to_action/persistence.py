@@ -0,0 +1,183 @@
+"""
+后台持久化模块 - 在独立线程中批量写入数据库和文件
+
+交互式搜索的搜索、摘要、下载阶段都以网络为主。写库和写文件交给后台线程后，这些阶段
+不再等待磁盘 I/O。队列有长度上限，写入跟不上时提交方会被阻塞（背压），内存不会无限增长。
+
+后台线程把短时间内提交的操作合并处理：连续的论文 upsert 合并为一次 add_papers，连续的
+任务结果合并为一个事务，文件写入等其他操作按提交顺序执行。flush() 让已提交的操作立即
+写出，用于阶段边界；进程退出时会自动写完队列中剩余的操作。
+"""
+import atexit
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional
+from rich.console import Console
+from .database import Database
+
+console = Console()
+
+# 队列中的操作类型
+_PAPERS = "papers"
+_JOB = "job"
+_CALL = "call"
+
+# 控制标记：结束当前批次 / 停止线程
+_FLUSH = object()
+_STOP = object()
+
+
+class PersistenceWriter:
+    """后台写入线程"""
+
+    def __init__(
+        self,
+        db: Database,
+        max_pending: int = 256,
+        batch_size: int = 200,
+        flush_interval: float = 1.0
+    ):
+        """
+        初始化并启动写入线程
+
+        Args:
+            db: 数据库实例
+            max_pending: 队列中最多等待的操作数，超出时提交方阻塞
+            batch_size: 一批最多合并的操作数
+            flush_interval: 一批最多等待新操作的时间（秒）
+        """
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _put(self, item):
+        if self._closed:
+            raise RuntimeError("persistence writer is closed")
+        self._queue.put(item)
+
+    def add_papers(self, papers: Iterable[Dict]):
+        """
+        提交论文 upsert
+
+        提交时复制每篇论文，之后对论文字典的修改不影响本次写入。
+
+        Args:
+            papers: 论文列表
+        """
+        snapshot = [dict(paper) for paper in papers]
+        if snapshot:
+            self._put((_PAPERS, snapshot))
+
+    def finish_job(self, batch_id: str, paper_key: str, stage: str, status: str,
+                   result: Any = None, error: Optional[str] = None):
+        """提交一条任务结果，参数同 Database.finish_job"""
+        self._put((_JOB, (batch_id, paper_key, stage, status, result, error)))
+
+    def call(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        提交任意写入操作（如保存文件），按提交顺序在写入线程中执行
+
+        Args:
+            func: 要执行的函数
+            *args, **kwargs: 函数参数
+
+        Returns:
+            Future，完成后可取得函数返回值或异常
+        """
+        future = Future()
+        self._put((_CALL, (future, func, args, kwargs)))
+        return future
+
+    def flush(self, wait: bool = True):
+        """
+        立即写出已提交的操作
+
+        Args:
+            wait: 是否阻塞直到全部写完；False 时只结束当前批次的等待
+        """
+        if self._closed:
+            return
+        self._queue.put(_FLUSH)
+        if wait:
+            self._queue.join()
+
+    def close(self):
+        """写完队列中剩余的操作并停止线程（可重复调用）"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # 在时间窗口内继续收集，合并为一批写入
+            deadline = time.monotonic() + self.flush_interval
+            while item is not _FLUSH and item is not _STOP and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            entries = [entry for entry in batch if isinstance(entry, tuple)]
+            try:
+                self._write(entries)
+            except Exception as e:
+                # 线程不能退出，未执行的 Future 也要有结果，否则等待方会一直阻塞
+                self._report(e)
+                for kind, payload in entries:
+                    if kind == _CALL and not payload[0].done():
+                        payload[0].set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is _STOP:
+                return
+
+    def _write(self, batch):
+        # 每组单独处理失败，一组出错不影响同批的其他操作，每个 Future 都会得到结果
+        for kind, group in itertools.groupby(batch, key=lambda entry: entry[0]):
+            payloads = [payload for _, payload in group]
+            if kind == _CALL:
+                for future, func, args, kwargs in payloads:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        future.set_result(func(*args, **kwargs))
+                    except Exception as e:
+                        future.set_exception(e)
+                        self._report(e)
+                continue
+
+            try:
+                if kind == _PAPERS:
+                    result = self.db.add_papers(paper for papers in payloads for paper in papers)
+                    if result.failed:
+                        self._report(f"{result.failed} 篇论文未能入库", result.failed)
+                else:
+                    self.db.finish_jobs(payloads)
+            except Exception as e:
+                self._report(e, sum(len(papers) for papers in payloads) if kind == _PAPERS else len(payloads))
+
+    def _report(self, error, count: int = 1):
+        self.errors += count
+        console.print(f"[red]✗ 后台写入失败：{error}[/red]")
@@ -0,0 +1,229 @@
+"""
+限流模块 - 按上游主机划分的共享令牌桶
+"""
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from rich.console import Console
+
+console = Console()
+
+# 各上游 API 的默认速率（请求/秒）
+DEFAULT_RATE_LIMITS = {
+    "export.arxiv.org": 1 / 3,  # ArXiv API 要求每 3 秒不超过 1 次请求
+    "arxiv.org": 4.0,
+    "api.semanticscholar.org": 1.0,
+}
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量），默认为 max(1, rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        # 令牌从该时刻起补充；暂停期间它位于未来，暂停结束前不积累令牌
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        预留令牌，不阻塞
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            调用方在发出请求前需要等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+            # 令牌不足时记为欠账，后续调用方依次排队；欠账从暂停结束时起按速率偿还
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return (self._updated - now) + wait
+
+    def acquire(self, tokens: float = 1.0):
+        """阻塞直到获得令牌"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """
+        收到限流信号后暂停发放令牌
+
+        暂停期间不补充令牌，排队的调用方在暂停结束后按速率依次放行，而不是同时发出。
+
+        Args:
+            seconds: 暂停时长（秒）
+        """
+        with self._lock:
+            # 暂停结束时只放行一个请求，之后按速率补充；此前已发出的预留不再计入
+            self._tokens = min(1.0, self.capacity)
+            self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """按主机名管理令牌桶的限流器"""
+
+    def __init__(self, limits: Optional[Dict[str, float]] = None):
+        """
+        初始化限流器
+
+        Args:
+            limits: 主机名到速率（请求/秒）的映射，未列出的主机不限流
+        """
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        for host, rate in (limits or {}).items():
+            self.set_limit(host, rate)
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """从 URL 中提取主机名"""
+        return (urlparse(url).hostname or url).lower()
+
+    def set_limit(self, host: str, rate: Optional[float], capacity: Optional[float] = None):
+        """
+        设置主机的速率限制
+
+        Args:
+            host: 主机名
+            rate: 速率（请求/秒），None 或非正数表示不限流
+            capacity: 突发容量
+        """
+        with self._lock:
+            if rate is None or float(rate) <= 0:
+                self._buckets.pop(host.lower(), None)
+            else:
+                self._buckets[host.lower()] = TokenBucket(float(rate), capacity)
+
+    def bucket(self, host: str) -> Optional[TokenBucket]:
+        """获取主机对应的令牌桶"""
+        return self._buckets.get(host.lower())
+
+    def reserve(self, host: str, tokens: float = 1.0) -> float:
+        """为主机预留令牌，返回需要等待的秒数"""
+        bucket = self.bucket(host)
+        return bucket.reserve(tokens) if bucket else 0.0
+
+    def acquire(self, host: str, tokens: float = 1.0):
+        """阻塞直到主机的令牌可用"""
+        bucket = self.bucket(host)
+        if bucket:
+            bucket.acquire(tokens)
+
+    def on_throttled(self, host: str, retry_after: Optional[float] = None) -> float:
+        """
+        处理 429 / Retry-After 信号，暂停该主机的所有请求
+
+        Args:
+            host: 主机名
+            retry_after: 服务端建议的等待秒数
+
+        Returns:
+            实际暂停的秒数
+        """
+        bucket = self.bucket(host)
+        if retry_after is None:
+            retry_after = max(1.0, 2.0 / bucket.rate) if bucket else 1.0
+        if bucket:
+            bucket.pause(retry_after)
+        console.print(f"[yellow]⚠ {host} 触发限流，暂停 {retry_after:.1f} 秒[/yellow]")
+        return retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 头（秒数或 HTTP 日期）
+
+    Args:
+        value: 头部值
+
+    Returns:
+        等待秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        from datetime import datetime, timezone
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def _limiter_from_config(config) -> RateLimiter:
+    """按 Config 中的 rate_limits 与 LLM 配置创建限流器"""
+    limits = dict(DEFAULT_RATE_LIMITS)
+    limits.update(config.get("rate_limits") or {})
+
+    base_url = config.get("base_url")
+    llm_rate = config.get("llm_requests_per_second")
+    if base_url and llm_rate:
+        limits.setdefault(RateLimiter.host_of(base_url), llm_rate)
+
+    return RateLimiter(limits)
+
+
+def configure_rate_limiter(config=None) -> RateLimiter:
+    """
+    根据配置重建全局限流器
+
+    Args:
+        config: Config 实例，None 表示加载默认配置
+
+    Returns:
+        新的全局限流器
+    """
+    global _rate_limiter
+
+    if config is None:
+        from .config import Config
+        config = Config()
+
+    limiter = _limiter_from_config(config)
+    with _limiter_lock:
+        _rate_limiter = limiter
+    return limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    获取全局限流器（首次调用时按默认配置创建）
+
+    Returns:
+        RateLimiter
+    """
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        from .config import Config
+        config = Config()
+        with _limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = _limiter_from_config(config)
+    return _rate_limiter
@@ -1,6 +1,7 @@
 """
 多数据源搜索管理器
 """
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
 from typing import List, Optional, Dict
 from .base import PaperSource, Paper
 from .arxiv import ArxivSource
@@ -36,10 +37,16 @@ class SourceManager:
         max_results: int = 20,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
+        timeout: Optional[float] = 60.0,
+        enrich: bool = False,
         **kwargs
     ) -> List[Paper]:
         """
-        跨数据源搜索
+        跨数据源并发搜索
+
+        各数据源在独立线程中同时查询，总耗时取决于最慢的数据源而非各源之和。
+        超时或失败的数据源不会阻塞其他数据源。结果按 source_names 的顺序合并，
+        重复论文保留排在前面的数据源的版本，与完成先后无关。
         
         Args:
             keywords: 搜索关键词
@@ -47,6 +54,8 @@ class SourceManager:
             max_results: 每个源的最大结果数
             start_date: 开始日期
             end_date: 结束日期
+            timeout: 每个数据源的截止时间（秒），None 表示不限
+            enrich: 是否用 Semantic Scholar 批量接口补全引用数、DOI 和 PDF 链接
             
         Returns:
             合并后的论文列表
@@ -54,30 +63,66 @@ class SourceManager:
         if source_names is None:
             source_names = [self.default_source]
         
-        all_papers = []
-        
+        sources = []
         for source_name in source_names:
             source = self.get_source(source_name)
             if source:
-                console.print(f"\n[cyan]📚 正在搜索 {source.name}...[/cyan]")
-                papers = source.search(
-                    keywords=keywords,
-                    max_results=max_results,
-                    start_date=start_date,
-                    end_date=end_date,
-                    **kwargs
-                )
-                all_papers.extend(papers)
-                console.print(f"[green]✓ {source.name}: 找到 {len(papers)} 篇[/green]")
+                sources.append(source)
             else:
                 console.print(f"[yellow]⚠ 未知数据源: {source_name}[/yellow]")
         
+        if not sources:
+            return []
+        
+        results: Dict[PaperSource, List[Paper]] = {}
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="paper-source")
+        futures = {}
+        for source in sources:
+            console.print(f"\n[cyan]📚 正在搜索 {source.name}...[/cyan]")
+            future = executor.submit(
+                source.search,
+                keywords=keywords,
+                max_results=max_results,
+                start_date=start_date,
+                end_date=end_date,
+                **kwargs
+            )
+            futures[future] = source
+        
+        try:
+            # 所有数据源同时开始，因此统一截止时间即为每个源的截止时间
+            for future in as_completed(futures, timeout=timeout):
+                source = futures[future]
+                try:
+                    papers = future.result()
+                except Exception as e:
+                    console.print(f"[red]✗ {source.name} 搜索失败: {str(e)}[/red]")
+                    continue
+                results[source] = papers
+                console.print(f"[green]✓ {source.name}: 找到 {len(papers)} 篇[/green]")
+        except FutureTimeoutError:
+            for future, source in futures.items():
+                if not future.done():
+                    console.print(f"[yellow]⚠ {source.name} 超过 {timeout} 秒未响应，已跳过[/yellow]")
+        finally:
+            # 不等待超时的数据源线程结束，避免慢源拖住整个搜索
+            executor.shutdown(wait=False)
+        
+        all_papers = [paper for source in sources for paper in results.get(source, [])]
+        
         # 去重（基于标题）
         unique_papers = self._deduplicate(all_papers)
         
         if len(unique_papers) < len(all_papers):
             console.print(f"[yellow]去除了 {len(all_papers) - len(unique_papers)} 篇重复论文[/yellow]")
         
+        if enrich:
+            # Semantic Scholar 的结果本身已带引用信息，只补全其他来源的论文
+            missing = [p for p in unique_papers if p.citations is None]
+            if missing:
+                semantic = self.sources.get('semantic') or SemanticScholarSource()
+                semantic.enrich(missing, use_cache=kwargs.get('use_cache', True))
+        
         return unique_papers
     
     def _deduplicate(self, papers: List[Paper]) -> List[Paper]:
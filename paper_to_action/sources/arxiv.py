@@ -1,15 +1,39 @@
 """
 ArXiv 数据源实现
 """
-import requests
+import io
 import xml.etree.ElementTree as ET
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 from .base import PaperSource, Paper
+from ..cache import get_response_cache
+from ..http_client import get_session
 from rich.console import Console
 
 console = Console()
 
 
+class _RecordingStream:
+    """包装响应流，在解析的同时记录读到的字节，供写入缓存"""
+    
+    def __init__(self, raw):
+        self._raw = raw
+        self._chunks = []
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._raw.read(size)
+        if data:
+            self._chunks.append(data)
+        return data
+    
+    def drain(self):
+        """读完剩余内容（提前结束解析时仍缓存完整页面）"""
+        while self.read(65536):
+            pass
+    
+    def getvalue(self) -> bytes:
+        return b''.join(self._chunks)
+
+
 class ArxivSource(PaperSource):
     """ArXiv 论文数据源"""
     
@@ -21,8 +45,21 @@ class ArxivSource(PaperSource):
     def description(self) -> str:
         return "开放获取的预印本论文库 (物理、数学、CS、生物等)"
     
-    def __init__(self, max_results: int = 20):
+    # Atom 命名空间
+    NAMESPACE = {'atom': 'http://www.w3.org/2005/Atom'}
+    ARXIV_NAMESPACE = {'arxiv': 'http://arxiv.org/schemas/atom'}
+    ENTRY_TAG = '{http://www.w3.org/2005/Atom}entry'
+    
+    def __init__(self, max_results: int = 20, page_size: int = 100):
+        """
+        初始化 ArXiv 数据源
+        
+        Args:
+            max_results: 默认最大结果数
+            page_size: 分页抓取时每页的条目数
+        """
         self.max_results = max_results
+        self.page_size = page_size
         self.base_url = "http://export.arxiv.org/api/query"
     
     def search(
@@ -41,150 +78,229 @@ class ArxivSource(PaperSource):
             max_results: 最大结果数
             start_date: 开始日期 (YYYY-MM-DD)
             end_date: 结束日期 (YYYY-MM-DD)
+            use_cache: 是否使用响应缓存（默认 True）
+            watermark: 上次运行的水位线（Database.get_watermark），只返回更新的论文
             
         Returns:
             论文列表
         """
-        # 构建查询参数
-        params = {
-            'search_query': f'all:{keywords}',
-            'start': 0,
-            'max_results': max_results,
-            'sortBy': 'lastUpdatedDate',
-            'sortOrder': 'descending'
-        }
-        
-        
-        # 重试机制
-        import time
-        max_retries = 3
-        retry_delay = 3  # 秒
+        papers = []
+        use_cache = kwargs.get('use_cache', True)
+        watermark = kwargs.get('watermark')
         
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(self.base_url, params=params, timeout=30)
-                
-                # 检查 429 错误
-                if response.status_code == 429:
-                    if attempt < max_retries - 1:
-                        console.print(f"[yellow]⚠ ArXiv API 限流，{retry_delay}秒后重试...[/yellow]")
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # 指数退避
-                        continue
-                    else:
-                        console.print(f"[red]✗ ArXiv API 限流，请稍后再试或减少搜索频率[/red]")
-                        return []
-                
-                response.raise_for_status()
-                papers = self._parse_response(response.text, start_date, end_date)
-                
-                # 添加小延迟避免触发限流
-                time.sleep(1)
-                return papers
-                
-            except requests.exceptions.HTTPError as e:
-                if attempt < max_retries - 1:
-                    console.print(f"[yellow]⚠ 请求失败，{retry_delay}秒后重试...[/yellow]")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-                    continue
-                else:
-                    console.print(f"[red]ArXiv 搜索失败: {str(e)}[/red]")
-                    return []
-            except Exception as e:
-                console.print(f"[red]ArXiv 搜索失败: {str(e)}[/red]")
-                return []
+        try:
+            for paper in self.harvest(keywords, max_results, start_date, end_date,
+                                      use_cache=use_cache, watermark=watermark):
+                papers.append(paper)
+        except Exception as e:
+            console.print(f"[red]ArXiv 搜索失败: {str(e)}[/red]")
         
-        return []
+        return papers
     
-    def _parse_response(
+    def harvest(
         self,
-        xml_data: str,
+        keywords: str,
+        max_results: Optional[int] = None,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
-    ) -> List[Paper]:
-        """解析 ArXiv API 返回的 XML 数据"""
-        papers = []
+        end_date: Optional[str] = None,
+        use_cache: bool = True,
+        watermark: Optional[Dict] = None
+    ) -> Iterator[Paper]:
+        """
+        分页流式抓取 ArXiv 论文
         
-        try:
-            root = ET.fromstring(xml_data)
-            namespace = {'atom': 'http://www.w3.org/2005/Atom'}
+        按 start 偏移逐页请求，每页用 iterparse 增量解析并逐条产出，内存占用与
+        请求总数无关。结果按更新时间降序排列，一旦越过 start_date 即停止翻页。
+        
+        Args:
+            keywords: 搜索关键词
+            max_results: 最大结果数，None 表示不限
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            use_cache: 是否使用响应缓存，命中的页面不再访问网络
+            watermark: 上次运行的水位线，遇到不晚于其更新时间的条目即停止
             
-            for entry in root.findall('atom:entry', namespace):
+        Yields:
+            Paper 对象
+        """
+        cache = get_response_cache()
+        since = watermark.get('last_updated') if watermark else None
+        seen_ids = watermark.get('seen_ids', set()) if watermark else set()
+        has_date_filter = bool(start_date or end_date or since)
+        yielded = 0
+        start = 0
+        
+        while max_results is None or yielded < max_results:
+            # 无日期过滤时，按剩余数量请求，避免多取
+            page_size = self.page_size
+            if max_results is not None and not has_date_filter:
+                page_size = min(page_size, max_results - yielded)
+            
+            params = {
+                'search_query': f'all:{keywords}',
+                'start': start,
+                'max_results': page_size,
+                'sortBy': 'lastUpdatedDate',
+                'sortOrder': 'descending'
+            }
+            
+            cache_key = cache.make_key('arxiv', self.base_url, params)
+            cached = cache.get(cache_key) if use_cache else None
+            response = None
+            
+            if cached is not None:
+                stream = io.BytesIO(cached)
+            else:
+                # 请求节奏由共享限流器控制；连接错误、5xx 和 429 由共享会话重试
+                response = get_session().get(self.base_url, params=params, timeout=30, stream=True)
+                
+                if response.status_code == 429:
+                    response.close()
+                    console.print(f"[red]✗ ArXiv API 限流，请稍后再试或减少搜索频率[/red]")
+                    return
+                
                 try:
-                    # 提取基本信息
-                    title = entry.find('atom:title', namespace).text.strip().replace('\n', ' ')
-                    summary = entry.find('atom:summary', namespace).text.strip().replace('\n', ' ')
+                    response.raise_for_status()
+                except Exception:
+                    response.close()
+                    raise
+                
+                response.raw.decode_content = True
+                stream = _RecordingStream(response.raw) if use_cache else response.raw
+            
+            cacheable = True
+            entries = 0
+            try:
+                for entry in self._iter_entries(stream):
+                    entries += 1
+                    paper = self._parse_entry(entry)
+                    if paper is None:
+                        continue
                     
-                    # 提取日期
-                    published = entry.find('atom:published', namespace).text
-                    updated = entry.find('atom:updated', namespace).text
+                    # 结果按更新时间降序，更新时间早于开始日期说明已越过时间窗口
+                    updated = paper.updated or paper.published
+                    if start_date and updated.split('T')[0] < start_date:
+                        return
+                    
+                    # 增量抓取：早于水位线的条目上次已处理过
+                    if since and updated < since:
+                        return
+                    if paper.source_id in seen_ids:
+                        continue
                     
                     # 日期过滤
-                    pub_date = published.split('T')[0]
+                    pub_date = paper.published.split('T')[0]
                     if start_date and pub_date < start_date:
                         continue
                     if end_date and pub_date > end_date:
                         continue
                     
-                    # 提取作者
-                    authors = []
-                    for author in entry.findall('atom:author', namespace):
-                        name = author.find('atom:name', namespace)
-                        if name is not None:
-                            authors.append(name.text)
-                    
-                    # 提取链接
-                    url = None
-                    pdf_url = None
-                    for link in entry.findall('atom:link', namespace):
-                        if link.get('type') == 'text/html':
-                            url = link.get('href')
-                        elif link.get('title') == 'pdf':
-                            pdf_url = link.get('href')
-                    
-                    # 提取 ArXiv ID
-                    id_text = entry.find('atom:id', namespace).text
-                    arxiv_id = id_text.split('/abs/')[-1]
-                    
-                    # 提取分类
-                    categories = []
-                    for category in entry.findall('atom:category', namespace):
-                        term = category.get('term')
-                        if term:
-                            categories.append(term)
-                    
-                    # 提取 DOI (如果有)
-                    doi = None
-                    doi_elem = entry.find('arxiv:doi', {'arxiv': 'http://arxiv.org/schemas/atom'})
-                    if doi_elem is not None:
-                        doi = doi_elem.text
-                    
-                    # 创建 Paper 对象
-                    paper = Paper(
-                        title=title,
-                        authors=authors,
-                        abstract=summary,
-                        published=published,
-                        updated=updated,
-                        source='arxiv',
-                        source_id=arxiv_id,
-                        doi=doi,
-                        url=url or f"https://arxiv.org/abs/{arxiv_id}",
-                        pdf_url=pdf_url or f"https://arxiv.org/pdf/{arxiv_id}.pdf",
-                        categories=categories
-                    )
-                    
-                    papers.append(paper)
-                    
-                except Exception as e:
-                    console.print(f"[yellow]解析论文条目失败: {str(e)}[/yellow]")
-                    continue
+                    yield paper
+                    yielded += 1
+                    if max_results is not None and yielded >= max_results:
+                        return
+            except ET.ParseError as e:
+                cacheable = False
+                console.print(f"[red]XML 解析失败: {str(e)}[/red]")
+                return
+            except Exception:
+                cacheable = False
+                raise
+            finally:
+                if response is not None:
+                    if isinstance(stream, _RecordingStream) and cacheable:
+                        try:
+                            stream.drain()
+                            cache.set(cache_key, stream.getvalue())
+                        except Exception:
+                            pass
+                    response.close()
             
-        except ET.ParseError as e:
-            console.print(f"[red]XML 解析失败: {str(e)}[/red]")
+            # 不足一页说明已到末尾
+            if entries < page_size:
+                return
+            start += entries
+    
+    def _iter_entries(self, stream) -> Iterator[ET.Element]:
+        """增量解析 Atom feed，逐个产出 entry 元素，处理后即从树中移除"""
+        root = None
         
-        return papers
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            
+            if elem.tag == self.ENTRY_TAG:
+                yield elem
+                # 释放已处理的条目，保持内存平稳
+                elem.clear()
+                root.remove(elem)
+    
+    def _parse_entry(self, entry: ET.Element) -> Optional[Paper]:
+        """解析单个 Atom entry 元素"""
+        namespace = self.NAMESPACE
+        
+        try:
+            # 提取基本信息
+            title = entry.find('atom:title', namespace).text.strip().replace('\n', ' ')
+            summary = entry.find('atom:summary', namespace).text.strip().replace('\n', ' ')
+            
+            # 提取日期
+            published = entry.find('atom:published', namespace).text
+            updated = entry.find('atom:updated', namespace).text
+            
+            # 提取作者
+            authors = []
+            for author in entry.findall('atom:author', namespace):
+                name = author.find('atom:name', namespace)
+                if name is not None:
+                    authors.append(name.text)
+            
+            # 提取链接
+            url = None
+            pdf_url = None
+            for link in entry.findall('atom:link', namespace):
+                if link.get('type') == 'text/html':
+                    url = link.get('href')
+                elif link.get('title') == 'pdf':
+                    pdf_url = link.get('href')
+            
+            # 提取 ArXiv ID
+            id_text = entry.find('atom:id', namespace).text
+            arxiv_id = id_text.split('/abs/')[-1]
+            
+            # 提取分类
+            categories = []
+            for category in entry.findall('atom:category', namespace):
+                term = category.get('term')
+                if term:
+                    categories.append(term)
+            
+            # 提取 DOI (如果有)
+            doi = None
+            doi_elem = entry.find('arxiv:doi', self.ARXIV_NAMESPACE)
+            if doi_elem is not None:
+                doi = doi_elem.text
+            
+            # 创建 Paper 对象
+            return Paper(
+                title=title,
+                authors=authors,
+                abstract=summary,
+                published=published,
+                updated=updated,
+                source='arxiv',
+                source_id=arxiv_id,
+                doi=doi,
+                url=url or f"https://arxiv.org/abs/{arxiv_id}",
+                pdf_url=pdf_url or f"https://arxiv.org/pdf/{arxiv_id}.pdf",
+                categories=categories
+            )
+            
+        except Exception as e:
+            console.print(f"[yellow]解析论文条目失败: {str(e)}[/yellow]")
+            return None
     
     def get_pdf_url(self, paper: Paper) -> Optional[str]:
         """获取 PDF URL"""
@@ -1,11 +1,13 @@
 """
 Semantic Scholar 数据源实现
 """
+import re
 import requests
 from typing import List, Optional
 from .base import PaperSource, Paper
+from ..cache import get_response_cache
+from ..http_client import get_session
 from rich.console import Console
-import time
 
 console = Console()
 
@@ -13,6 +15,12 @@ console = Console()
 class SemanticScholarSource(PaperSource):
     """Semantic Scholar 论文数据源 - AI驱动的学术搜索"""
     
+    # 请求返回的字段
+    FIELDS = 'paperId,title,abstract,authors,year,publicationDate,citationCount,url,openAccessPdf,journal,externalIds'
+    
+    # /paper/batch 接口单次最多 500 个 ID
+    BATCH_SIZE = 500
+    
     @property
     def name(self) -> str:
         return "Semantic Scholar"
@@ -24,6 +32,7 @@ class SemanticScholarSource(PaperSource):
     def __init__(self):
         self.base_url = "https://api.semanticscholar.org/graph/v1"
         self.search_url = f"{self.base_url}/paper/search"
+        self.batch_url = f"{self.base_url}/paper/batch"
     
     def search(
         self,
@@ -41,18 +50,24 @@ class SemanticScholarSource(PaperSource):
             max_results: 最大结果数
             start_date: 开始日期 (YYYY-MM-DD)
             end_date: 结束日期 (YYYY-MM-DD)
+            use_cache: 是否使用响应缓存（默认 True）
+            watermark: 上次运行的水位线（Database.get_watermark），只返回更新的论文
             
         Returns:
             论文列表
         """
         papers = []
+        use_cache = kwargs.get('use_cache', True)
+        watermark = kwargs.get('watermark')
+        since = watermark.get('last_published') if watermark else None
+        seen_ids = watermark.get('seen_ids', set()) if watermark else set()
         
         try:
             # Semantic Scholar API 参数
             params = {
                 'query': keywords,
                 'limit': min(max_results, 100),  # API 限制
-                'fields': 'paperId,title,abstract,authors,year,publicationDate,citationCount,url,openAccessPdf,journal,externalIds'
+                'fields': self.FIELDS
             }
             
             # 添加年份过滤
@@ -66,21 +81,20 @@ class SemanticScholarSource(PaperSource):
             elif end_date:
                 params['year'] = f"-{end_date[:4]}"
             
-            response = requests.get(
-                self.search_url,
-                params=params,
-                timeout=30,
-                headers={'User-Agent': 'PaperSeek (mailto:research@example.com)'}
-            )
-            response.raise_for_status()
+            # 增量抓取：只请求水位线之后发表的论文
+            if since and since[:4].isdigit():
+                params['publicationDateOrYear'] = f"{since[:10]}:"
             
-            data = response.json()
+            data = self._get_json(self.search_url, params, use_cache=use_cache, timeout=30)
             
             if 'data' in data:
                 for item in data['data']:
                     paper = self._parse_paper(item, start_date, end_date)
-                    if paper:
-                        papers.append(paper)
+                    if not paper:
+                        continue
+                    if paper.source_id in seen_ids or (since and paper.published < since):
+                        continue
+                    papers.append(paper)
             
             console.print(f"[green]✓ Semantic Scholar 找到 {len(papers)} 篇论文[/green]")
             
@@ -91,6 +105,142 @@ class SemanticScholarSource(PaperSource):
         
         return papers
     
+    def _get_json(self, url: str, params: dict, use_cache: bool = True, timeout: int = 30):
+        """
+        发送 GET 请求并解析 JSON，命中响应缓存时不访问网络
+        
+        Args:
+            url: 请求 URL
+            params: 查询参数
+            use_cache: 是否使用响应缓存
+            timeout: 超时时间（秒）
+            
+        Returns:
+            解析后的 JSON 数据
+        """
+        cache = get_response_cache()
+        cache_key = cache.make_key('semantic_scholar', url, params)
+        
+        if use_cache:
+            cached = cache.get_json(cache_key)
+            if cached is not None:
+                return cached
+        
+        response = get_session().get(
+            url,
+            params=params,
+            timeout=timeout,
+            headers={'User-Agent': 'PaperSeek (mailto:research@example.com)'}
+        )
+        response.raise_for_status()
+        
+        data = response.json()
+        if use_cache:
+            cache.set(cache_key, response.content)
+        return data
+    
+    def get_details_batch(self, ids: List[str], use_cache: bool = True) -> List[Optional[Paper]]:
+        """
+        通过 /paper/batch 接口批量获取论文详情
+        
+        Args:
+            ids: 论文标识列表，可混用 S2 paperId、"ArXiv:2301.01234"、"DOI:10.xxx" 等
+            use_cache: 是否使用响应缓存
+            
+        Returns:
+            与 ids 一一对应的论文列表，未找到的位置为 None
+        """
+        results: List[Optional[Paper]] = []
+        cache = get_response_cache()
+        
+        for i in range(0, len(ids), self.BATCH_SIZE):
+            chunk = ids[i:i + self.BATCH_SIZE]
+            cache_key = cache.make_key('semantic_scholar', self.batch_url, self.FIELDS, chunk)
+            data = cache.get_json(cache_key) if use_cache else None
+            if data is not None and not self._batch_matches(data, chunk):
+                data = None
+            
+            if data is None:
+                try:
+                    response = get_session().post(
+                        self.batch_url,
+                        params={'fields': self.FIELDS},
+                        json={'ids': chunk},
+                        timeout=60,
+                        headers={'User-Agent': 'PaperSeek (mailto:research@example.com)'}
+                    )
+                    response.raise_for_status()
+                    data = response.json()
+                    # 结果按位置对应请求的 ID，长度不符时无法对齐，整批按失败处理
+                    if not self._batch_matches(data, chunk):
+                        raise ValueError(f"响应不是 {len(chunk)} 条结果的列表")
+                    if use_cache:
+                        cache.set(cache_key, response.content)
+                except Exception as e:
+                    console.print(f"[red]Semantic Scholar 批量查询失败: {str(e)}[/red]")
+                    data = [None] * len(chunk)
+            
+            for item in data:
+                results.append(self._parse_paper(item) if isinstance(item, dict) else None)
+        
+        return results
+    
+    @staticmethod
+    def _batch_matches(data, chunk: List[str]) -> bool:
+        """批量接口的响应是否与请求一一对应"""
+        return isinstance(data, list) and len(data) == len(chunk)
+    
+    def enrich(self, papers: List[Paper], use_cache: bool = True) -> List[Paper]:
+        """
+        用 Semantic Scholar 数据补全论文的引用数、DOI 和开放获取 PDF
+        
+        每 500 篇论文只需一次请求。
+        
+        Args:
+            papers: 论文列表（任意数据源）
+            use_cache: 是否使用响应缓存
+            
+        Returns:
+            原论文列表（就地补全）
+        """
+        targets: List[Paper] = []
+        ids: List[str] = []
+        
+        for paper in papers:
+            identifier = self._lookup_id(paper)
+            if identifier:
+                targets.append(paper)
+                ids.append(identifier)
+        
+        if not ids:
+            return papers
+        
+        enriched = 0
+        for paper, details in zip(targets, self.get_details_batch(ids, use_cache=use_cache)):
+            if details is None:
+                continue
+            paper.citations = details.citations
+            paper.doi = paper.doi or details.doi
+            paper.pdf_url = paper.pdf_url or details.pdf_url
+            paper.journal = paper.journal or details.journal
+            enriched += 1
+        
+        console.print(f"[green]✓ Semantic Scholar 补全了 {enriched}/{len(papers)} 篇论文的引用信息[/green]")
+        return papers
+    
+    @staticmethod
+    def _lookup_id(paper: Paper) -> Optional[str]:
+        """生成 /paper/batch 接口可识别的论文标识"""
+        if paper.source == 'semantic_scholar' and paper.source_id:
+            return paper.source_id
+        if paper.doi:
+            return f"DOI:{paper.doi}"
+        if paper.source == 'arxiv' and paper.source_id:
+            # 去掉版本号：2301.01234v2 -> 2301.01234
+            arxiv_id = re.sub(r'v\d+$', '', paper.source_id)
+            return f"ArXiv:{arxiv_id}"
+        return None
+    
     def _parse_paper(
         self,
         data: dict,
@@ -181,13 +331,10 @@ class SemanticScholarSource(PaperSource):
         try:
             url = f"{self.base_url}/paper/{source_id}"
             params = {
-                'fields': 'paperId,title,abstract,authors,year,publicationDate,citationCount,url,openAccessPdf,journal,externalIds'
+                'fields': self.FIELDS
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get_json(url, params, timeout=10)
             return self._parse_paper(data)
             
         except Exception as e:
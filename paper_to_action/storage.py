@@ -98,6 +98,10 @@ class PaperStorage:
                         f.write("### 🤖 AI 核心创新点总结\n\n")
                         f.write(f"{paper['ai_summary']}\n\n")
                     
+                    # 关键方法
+                    if paper.get('key_methods'):
+                        f.write(f"**关键方法：** {', '.join(paper['key_methods'])}\n\n")
+                    
                     # 原始摘要
                     f.write("### 📄 原始摘要\n\n")
                     f.write(f"{paper.get('summary', 'N/A')}\n\n")
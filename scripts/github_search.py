@@ -14,8 +14,9 @@ sys.path.insert(0, str(project_root))
 from paper_to_action.crawler import ArxivCrawler
 from paper_to_action.llm_client import LLMClient
 from paper_to_action.storage import PaperStorage
-from paper_to_action.config import Config
+from paper_to_action.config import configure_runtime
 from paper_to_action.pdf_downloader import PDFDownloader
+from paper_to_action.database import Database
 from rich.console import Console
 
 console = Console()
@@ -28,20 +29,31 @@ def main():
     enable_ai_summary = (sys.argv[3] if len(sys.argv) > 3 else os.getenv('ENABLE_AI_SUMMARY', 'true')).lower() == 'true'
     enable_tagging = (sys.argv[4] if len(sys.argv) > 4 else os.getenv('ENABLE_TAGGING', 'true')).lower() == 'true'
     download_pdf = (sys.argv[5] if len(sys.argv) > 5 else os.getenv('DOWNLOAD_PDF', 'false')).lower() == 'true'
+    incremental = (sys.argv[6] if len(sys.argv) > 6 else os.getenv('INCREMENTAL', 'true')).lower() == 'true'
     
     console.print(f"[cyan]🔍 搜索关键词: {keywords}[/cyan]")
     console.print(f"[cyan]📊 最大结果数: {max_results}[/cyan]")
     console.print(f"[cyan]🤖 AI摘要: {'✅ 开启' if enable_ai_summary else '❌ 关闭'}[/cyan]")
     console.print(f"[cyan]🏷️  自动标签: {'✅ 开启' if enable_tagging else '❌ 关闭'}[/cyan]")
     console.print(f"[cyan]📄 下载PDF: {'✅ 开启' if download_pdf else '❌ 关闭'}[/cyan]")
+    console.print(f"[cyan]⏩ 增量抓取: {'✅ 开启' if incremental else '❌ 关闭'}[/cyan]")
     
     try:
         # Initialize components
-        config = Config()
+        config = configure_runtime()
         crawler = ArxivCrawler(max_results=max_results)
         
+        # Watermarks live next to the results so they are committed with them
+        output_dir = config.get('output_dir', 'papers')
+        os.makedirs(output_dir, exist_ok=True)
+        db = Database(os.path.join(output_dir, 'paper_robot.db'))
+        query_key = Database.make_query_key('arxiv', keywords)
+        watermark = db.get_watermark(query_key) if incremental else None
+        if watermark:
+            console.print(f"[cyan]⏩ Only fetching papers newer than {watermark['last_published']}[/cyan]")
+        
         # Search papers
-        papers = crawler.search_papers(keywords)
+        papers = crawler.search_papers(keywords, watermark=watermark)
         
         if not papers:
             console.print("[yellow]⚠️  No papers found[/yellow]")
@@ -57,7 +69,9 @@ def main():
             llm_client = LLMClient(
                 api_key=api_key,
                 base_url=config.get('base_url', 'https://api.openai.com/v1'),
-                model=config.get('model', 'gpt-4o-mini')
+                model=config.get('model', 'gpt-4o-mini'),
+                max_concurrency=int(config.get('llm_max_concurrency', 8)),
+                pack_token_budget=int(config.get('llm_pack_token_budget', 4000))
             )
         elif not api_key:
             console.print("[yellow]⚠️  No API key found in config[/yellow]")
@@ -66,8 +80,10 @@ def main():
         if enable_ai_summary:
             if llm_client:
                 console.print("[cyan]🤖 Generating summaries with LLM...[/cyan]")
-                # Use batch_summarize for better performance
-                papers = llm_client.batch_summarize(papers, language='zh', delay=0.5)
+                # Reuse summaries already stored for papers seen in earlier runs
+                db.fill_ai_summaries(papers)
+                # With tagging enabled, summary and tags come from one request per paper
+                papers = llm_client.batch_summarize(papers, language='zh', with_tags=enable_tagging, max_tags=5)
                 console.print(f"[green]✓ All {len(papers)} summaries generated[/green]")
             else:
                 console.print("[yellow]⚠️  Cannot generate summaries: No API key configured[/yellow]")
@@ -77,7 +93,7 @@ def main():
         # Generate tags if enabled
         if enable_tagging:
             if llm_client:
-                # Use LLM to generate tags
+                # Use LLM to generate tags (papers already tagged above are skipped)
                 console.print("[cyan]🏷️  Generating tags with LLM...[/cyan]")
                 papers = llm_client.batch_generate_tags(papers, max_tags=5)
                 console.print(f"[green]✓ All tags generated[/green]")
@@ -100,14 +116,19 @@ def main():
             console.print("[cyan]📄 Downloading PDFs...[/cyan]")
             output_dir = config.get('output_dir', 'papers')
             pdf_dir = f"{output_dir}/pdfs"
-            downloader = PDFDownloader(output_dir=pdf_dir)
+            downloader = PDFDownloader(
+                output_dir=pdf_dir,
+                max_workers=int(config.get('pdf_max_workers', 4)),
+                per_host_limit=int(config.get('pdf_per_host_limit', 2)),
+                max_bandwidth=float(config.get('pdf_max_bandwidth_kb', 0)) * 1024 or None,
+                manifest=db
+            )
             stats = downloader.batch_download(papers)
             downloader.print_download_report(stats)
         else:
             console.print("[yellow]ℹ️  PDF download disabled by user[/yellow]")
         
         # Save papers
-        output_dir = config.get('output_dir', 'papers')
         storage = PaperStorage(output_dir)
         
         # Save as markdown
@@ -118,6 +139,19 @@ def main():
         json_file = storage.save_papers_json(papers, keywords)
         console.print(f"[green]✓ Saved to: {json_file}[/green]")
         
+        # Store papers with their summaries so later runs can reuse them
+        result = db.add_papers(papers)
+        console.print(f"[green]✓ Stored {result.inserted} new and {result.updated} updated papers[/green]")
+        
+        # Advance the watermark only after every stage succeeded
+        if incremental and not db.update_watermark(query_key, 'arxiv', keywords, papers,
+                                                   truncated=crawler.truncated):
+            console.print(f"[yellow]⚠️  Hit max_results ({max_results}) before reaching the watermark; "
+                          f"keeping it so later runs can fetch the rest. Consider raising max_results.[/yellow]")
+        
+        # Fold the WAL into the database file before the workflow commits it
+        db.close()
+        
         console.print("[bold green]🎉 Done![/bold green]")
         
     except Exception as e:
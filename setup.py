@@ -37,6 +37,9 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        "pdf": ["pypdf>=3.0.0"],
+    },
     entry_points={
         "console_scripts": [
             "paper-seek-max=paper_to_action.cli.interface:main",
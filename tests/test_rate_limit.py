@@ -0,0 +1,36 @@
+"""
+令牌桶暂停后的放行顺序
+"""
+from paper_to_action import rate_limit
+from paper_to_action.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_pause_spreads_queued_callers(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    bucket = TokenBucket(rate=1.0)
+
+    assert bucket.reserve() == 0.0
+    bucket.pause(10)
+
+    # 暂停期间排队的 5 个调用方应在暂停结束后每秒放行一个，而不是同时发出
+    clock.now += 2
+    waits = [bucket.reserve() for _ in range(5)]
+    release_times = [clock.now + wait for wait in waits]
+    assert release_times == [110.0, 111.0, 112.0, 113.0, 114.0]
+
+
+def test_pause_does_not_accrue_tokens():
+    bucket = TokenBucket(rate=5.0, capacity=5.0)
+    bucket.pause(0.2)
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits[0] > 0.1
+    assert waits[2] - waits[0] >= 0.39
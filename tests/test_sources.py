@@ -0,0 +1,53 @@
+"""
+多数据源并发搜索的合并顺序
+"""
+import threading
+import time
+
+from paper_to_action.sources import SourceManager
+from paper_to_action.sources.base import Paper, PaperSource
+
+
+class FakeSource(PaperSource):
+    def __init__(self, source, wait=None, done=None):
+        self.source = source
+        self.wait = wait
+        self.done = done
+
+    @property
+    def name(self):
+        return self.source
+
+    @property
+    def description(self):
+        return self.source
+
+    def search(self, keywords, max_results=20, start_date=None, end_date=None, **kwargs):
+        if self.wait is not None:
+            assert self.wait.wait(5)
+            # 让先完成的数据源的 future 先得到结果
+            time.sleep(0.2)
+        paper = Paper(
+            title="Graph Neural Networks", authors=["Author"], abstract="", published="2024-01-01",
+            source=self.source, source_id=f"{self.source}-1", url=""
+        )
+        if self.done is not None:
+            self.done.set()
+        return [paper]
+
+    def get_pdf_url(self, paper):
+        return None
+
+
+def test_duplicates_keep_the_first_listed_source():
+    # semantic 先完成，arxiv 等它完成后才返回
+    semantic_done = threading.Event()
+    manager = SourceManager()
+    manager.sources = {
+        'arxiv': FakeSource('arxiv', wait=semantic_done),
+        'semantic': FakeSource('semantic', done=semantic_done),
+    }
+
+    papers = manager.search("graphs", source_names=['arxiv', 'semantic'], timeout=10)
+
+    assert [paper.source for paper in papers] == ['arxiv']
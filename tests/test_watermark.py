@@ -0,0 +1,59 @@
+"""
+增量抓取的水位线：结果被 max_results 截断时不推进
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+from paper_to_action import crawler as crawler_module
+from paper_to_action.cache import ResponseCache
+from paper_to_action.crawler import ArxivCrawler
+from paper_to_action.database import Database
+
+
+class FakeClient:
+    """按提交时间倒序返回论文，最多 max_results 篇，与 arxiv.Client 一致"""
+
+    def __init__(self, days):
+        self.days = days
+
+    def results(self, search):
+        for day in sorted(self.days, reverse=True)[:search.max_results]:
+            yield SimpleNamespace(
+                entry_id=f"http://arxiv.org/abs/2401.{day:05d}v1",
+                title=f"Paper {day}",
+                authors=[SimpleNamespace(name="Author")],
+                summary="summary",
+                pdf_url=f"https://arxiv.org/pdf/2401.{day:05d}v1",
+                published=datetime(2024, 1, day),
+                categories=["cs.LG"],
+                primary_category="cs.LG",
+            )
+
+
+def harvest(monkeypatch, db, days, max_results):
+    """按 CLI 与 github_search 的方式运行一次增量抓取，返回水位线是否推进"""
+    crawler = ArxivCrawler(max_results=max_results)
+    monkeypatch.setattr(crawler, "_client", lambda: FakeClient(days))
+    query_key = Database.make_query_key("arxiv", "graphs")
+    papers = crawler.search_papers("graphs", use_cache=False, watermark=db.get_watermark(query_key))
+    return db.update_watermark(query_key, "arxiv", "graphs", papers, truncated=crawler.truncated)
+
+
+def test_watermark_waits_for_a_complete_window(monkeypatch, tmp_path):
+    disabled = ResponseCache(str(tmp_path / "cache.db"), enabled=False)
+    monkeypatch.setattr(crawler_module, "get_response_cache", lambda: disabled)
+    db = Database(str(tmp_path / "papers.db"))
+    query_key = Database.make_query_key("arxiv", "graphs")
+
+    # 首次运行没有可遗漏的窗口，即使结果被截断也要建立水位线
+    assert harvest(monkeypatch, db, range(1, 6), max_results=3)
+    assert db.get_watermark(query_key)["last_published"] == "2024-01-05"
+
+    # 水位线之后新增 4 篇，max_results=3 取不全，水位线保持不变
+    days = range(1, 10)
+    assert not harvest(monkeypatch, db, days, max_results=3)
+    assert db.get_watermark(query_key)["last_published"] == "2024-01-05"
+
+    # 取到水位线之前的论文说明窗口已完整，水位线推进到最新一篇
+    assert harvest(monkeypatch, db, days, max_results=10)
+    assert db.get_watermark(query_key)["last_published"] == "2024-01-09"